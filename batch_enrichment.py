@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Batch Enrichment
+Vectorized versions of the simple_parser keyword, region and property type
+extractors for a pandas Series (or list) of messages.
+
+Each extractor runs a handful of combined-alternation str.findall /
+str.contains passes over the whole column, and the per-row results are
+joined and filtered with grouped and vectorized pandas operations. It
+returns exactly what the scalar function returns for every row. The regex
+passes dominate the cost and pandas still applies them row by row, so on the
+exports this runs at about the speed of the scalar path; it is a
+column-at-a-time API, not a speedup.
+
+Run this file directly to check batch/scalar equivalence and timing on the
+chat exports (or on a CSV/columnar file given on the command line).
+"""
+
+import sys
+import glob
+import time
+
+import pandas as pd
+
+from simple_parser import (
+    KEYWORD_MATCHER, build_keyword_matcher, STATUS_KEYWORD_ORDER, CASE_SENSITIVE_KEYWORDS,
+    PROPERTY_CONTEXT_KEYWORDS, PROPERTY_TYPE_PRIORITY, PROPERTY_TYPE_ARABIC,
+    REGION_CITIES, NEIGHBORHOOD_PATTERNS, DIRECTION_PATTERNS, LOCATION_PATTERNS,
+    LOCATION_STOPWORDS, MAX_REGIONS, direction_region,
+    extract_status_keywords, extract_region_names, extract_property_type, iter_chat_messages,
+)
+
+# The keyword trie wrapped in a lookahead: findall then reports the longest
+# keyword starting at every position, so overlapping keywords are all found
+KEYWORD_LOOKAHEAD_PATTERN = f"(?=({KEYWORD_MATCHER['pattern'].pattern}))"
+
+# The same trick over the lowered city names; categories map them back to table entries
+CITY_MATCHER = build_keyword_matcher((city.lower(), city) for city in REGION_CITIES)
+CITY_LOOKAHEAD_PATTERN = f"(?=({CITY_MATCHER['pattern'].pattern}))"
+CITY_ORDER = {city: i for i, city in reversed(list(enumerate(REGION_CITIES)))}
+
+def as_text_series(texts):
+    """Object Series of strings (missing values become ''); a list gets a default index
+    
+    Rows are matched up by index label, so a Series must have a unique index.
+    """
+    if not isinstance(texts, pd.Series):
+        texts = pd.Series(list(texts), dtype=object)
+    texts = texts.astype(object).fillna('')
+    if pd.api.types.infer_dtype(texts, skipna=False) not in ('string', 'empty'):
+        texts = texts.astype(str).astype(object)
+    return texts
+
+def join_per_row(rows, values, index):
+    """', '-join the values of each row (pairs already in output order)"""
+    if len(values) == 0:
+        return pd.Series('', index=index, dtype=object)
+    # A grouped sum concatenates object strings in C; agg(', '.join) would build a Series per row
+    suffixed = pd.Series(values.to_numpy(dtype=object), index=rows.to_numpy()) + ', '
+    joined = suffixed.groupby(level=0, sort=False).sum().str[:-2]
+    return joined.reindex(index, fill_value='').astype(object)
+
+def findall_long(texts, pattern):
+    """str.findall exploded to one entry per match, indexed by row, in match order"""
+    found = texts.str.findall(pattern).explode()
+    return found[found.notna()]
+
+def keyword_hits_batch(texts):
+    """Long DataFrame of (row, keyword, category) for every keyword hit, like scan_keywords"""
+    texts = as_text_series(texts)
+    found = findall_long(texts.str.lower(), KEYWORD_LOOKAHEAD_PATTERN)
+
+    # Longest keyword at each position -> every keyword it contains
+    keywords = found.map(KEYWORD_MATCHER['outputs']).explode()
+    hits = pd.DataFrame({'row': keywords.index, 'keyword': keywords.to_numpy()}).drop_duplicates()
+
+    hits['category'] = hits['keyword'].map(KEYWORD_MATCHER['categories'])
+    hits = hits.explode('category')
+
+    # Context keywords only count when they appear with their original case
+    is_context = hits['category'].str.startswith('context:')
+    if is_context.any():
+        present = pd.Series(False, index=hits.index)
+        for keyword in CASE_SENSITIVE_KEYWORDS:
+            rows = is_context & (hits['keyword'] == keyword)
+            if rows.any():
+                candidates = texts[hits.loc[rows, 'row']]
+                present[rows] = candidates.str.contains(keyword, regex=False).to_numpy(dtype=bool)
+        hits = hits[~is_context | present]
+    return hits.reset_index(drop=True)
+
+def extract_status_keywords_batch(texts, hits=None):
+    """Batch extract_status_keywords: Series of comma-joined status keywords"""
+    texts = as_text_series(texts)
+    if hits is None:
+        hits = keyword_hits_batch(texts)
+
+    status = hits[hits['category'] == 'status']
+    status = status.assign(order=status['keyword'].map(STATUS_KEYWORD_ORDER)).sort_values(['row', 'order'])
+    return join_per_row(status['row'], status['keyword'], texts.index)
+
+# Rank of each category when choosing a property type: explicit types in
+# priority order, then the context clues in their table order
+PROPERTY_CATEGORY_RANK = {f"type:{prop_type}": rank for rank, prop_type in enumerate(PROPERTY_TYPE_PRIORITY)}
+PROPERTY_CATEGORY_RANK.update({f"context:{prop_type}": len(PROPERTY_TYPE_PRIORITY) + rank
+                               for rank, prop_type in enumerate(PROPERTY_CONTEXT_KEYWORDS)})
+PROPERTY_RANK_NAME = {rank: PROPERTY_TYPE_ARABIC[category.split(':', 1)[1]]
+                      for category, rank in PROPERTY_CATEGORY_RANK.items()}
+
+def extract_property_type_batch(texts, hits=None):
+    """Batch extract_property_type: Series of Arabic property type names ('' if none)"""
+    texts = as_text_series(texts)
+    if hits is None:
+        hits = keyword_hits_batch(texts)
+
+    # The best-ranked category of each row decides its type
+    ranks = hits['category'].map(PROPERTY_CATEGORY_RANK)
+    best = ranks.groupby(hits['row']).min().dropna()
+    return best.map(PROPERTY_RANK_NAME).reindex(texts.index, fill_value='').astype(object)
+
+def extract_region_names_batch(texts):
+    """Batch extract_region_names: Series of comma-joined region names"""
+    texts = as_text_series(texts)
+    parts = []
+
+    # Cities: one findall pass for every city name, reported in table order
+    found = findall_long(texts.str.lower(), CITY_LOOKAHEAD_PATTERN)
+    if not found.empty:
+        cities = found.map(CITY_MATCHER['outputs']).explode().map(CITY_MATCHER['categories']).explode()
+        cities = pd.DataFrame({'row': cities.index, 'region': cities.to_numpy()}).drop_duplicates()
+        parts.append(cities.assign(stage=0, order=cities['region'].map(CITY_ORDER), match=0))
+
+    # Neighborhoods, directions and locations: one findall pass per pattern, in scalar order
+    stage = 1
+    labelled = [(pattern, label.format) for pattern, label in NEIGHBORHOOD_PATTERNS]
+    labelled += [(pattern, direction_region) for pattern in DIRECTION_PATTERNS]
+    labelled += [(pattern, None) for pattern in LOCATION_PATTERNS]
+    for order, (pattern, label) in enumerate(labelled):
+        found = findall_long(texts, pattern)
+        if found.empty:
+            continue
+        if label is None:
+            found = found[~found.str.lower().isin(LOCATION_STOPWORDS) & (found.str.len() >= 3)]
+            regions = found.to_numpy()
+        else:
+            regions = found.map(label).to_numpy()
+        parts.append(pd.DataFrame({
+            'row': found.index,
+            'stage': stage,
+            'order': order,
+            'match': range(len(found)),
+            'region': regions,
+        }))
+
+    if not parts:
+        return pd.Series('', index=texts.index, dtype=object)
+    found = pd.concat(parts, ignore_index=True)
+    found['region'] = found['region'].str.strip()
+    found = found[found['region'].str.len() >= 2]
+
+    # Order of first appearance, as in the scalar function, then dedupe and cap
+    found = found.sort_values(['row', 'stage', 'order', 'match'], kind='stable')
+    found = found.drop_duplicates(['row', 'region'])
+    found = found.groupby('row', sort=False).head(MAX_REGIONS)
+    return join_per_row(found['row'], found['region'], texts.index)
+
+def enrich_batch(texts):
+    """status, region and property_type columns for every message, as a DataFrame"""
+    texts = as_text_series(texts)
+    hits = keyword_hits_batch(texts)
+    return pd.DataFrame({
+        'status': extract_status_keywords_batch(texts, hits),
+        'region': extract_region_names_batch(texts),
+        'property_type': extract_property_type_batch(texts, hits),
+    }, index=texts.index)
+
+def enrich_scalar(texts):
+    """The same DataFrame built with the one-message-at-a-time extractors"""
+    texts = as_text_series(texts)
+    return pd.DataFrame({
+        'status': [extract_status_keywords(text) for text in texts],
+        'region': [extract_region_names(text) for text in texts],
+        'property_type': [extract_property_type(text) for text in texts],
+    }, index=texts.index)
+
+def compare_with_scalar(texts):
+    """Run both paths; returns (mismatching rows DataFrame, batch seconds, scalar seconds)"""
+    texts = as_text_series(texts)
+    start = time.perf_counter()
+    batch = enrich_batch(texts)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scalar = enrich_scalar(texts)
+    scalar_time = time.perf_counter() - start
+
+    differs = (batch != scalar).any(axis=1)
+    mismatches = pd.concat([texts[differs].rename('text'), batch[differs].add_suffix('_batch'),
+                            scalar[differs].add_suffix('_scalar')], axis=1)
+    return mismatches, batch_time, scalar_time
+
+def load_messages(path=None):
+    """Original message texts from a parser output file, or parsed from the chat exports"""
+    if path is None:
+        files = sorted(glob.glob("whatsapp_chat_exports/_chat*.txt"))
+        return pd.Series([msg.message_backup for filename in files for msg in iter_chat_messages(filename)], dtype=object)
+    if path.endswith('.csv'):
+        return pd.read_csv(path, usecols=['message_backup'], dtype=str, keep_default_na=False)['message_backup']
+    from columnar_store import read_columns
+    return pd.Series(read_columns(path, ['message_backup'])['message_backup'], dtype=object)
+
+def main():
+    """Equivalence check and timing of the batch extractors against the scalar ones"""
+    print("🧮 Batch Enrichment Equivalence Check")
+    print("=" * 50)
+
+    texts = load_messages(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"Messages: {len(texts):,}")
+
+    mismatches, batch_time, scalar_time = compare_with_scalar(texts)
+    print(f"Batch:  {batch_time:.2f}s ({len(texts) / max(batch_time, 1e-9):,.0f} msgs/s)")
+    print(f"Scalar: {scalar_time:.2f}s ({len(texts) / max(scalar_time, 1e-9):,.0f} msgs/s)")
+
+    if mismatches.empty:
+        print("✅ Batch and scalar results are identical")
+        return True
+
+    print(f"❌ {len(mismatches)} message(s) differ, first few:")
+    for row in mismatches.head(5).itertuples():
+        print(f"  - {row.text[:60]!r}")
+        for column in ('status', 'region', 'property_type'):
+            batch_value, scalar_value = getattr(row, f"{column}_batch"), getattr(row, f"{column}_scalar")
+            if batch_value != scalar_value:
+                print(f"      {column}: batch={batch_value!r} scalar={scalar_value!r}")
+    return False
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
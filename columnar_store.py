@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Columnar storage for parsed WhatsApp messages.
+Writes Parquet when pyarrow is installed and a plain column directory
+(one JSON-lines file per column) otherwise. Both can be read back with
+column projection, so a consumer that only needs `message` never reads
+`message_backup`.
+
+Author: Real Estate Data Processing System
+Date: 2025
+"""
+
+import os
+import json
+import shutil
+from importlib.util import find_spec
+
+# pyarrow is only imported when a Parquet file is read or written, so importing
+# this module (and the parser, which does) stays cheap for CSV-only runs
+PARQUET_AVAILABLE = find_spec('pyarrow') is not None
+
+def load_pyarrow(action):
+    """Import pyarrow for `action` ('read' or 'write'); returns (pyarrow, pyarrow.parquet)"""
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError(f"pyarrow is required to {action} Parquet files (pip install pyarrow)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+# Metadata file of a column directory
+COLUMNS_META = 'columns.json'
+
+def columnar_path(base):
+    """Output path for `base`: base.parquet with pyarrow, base.columns without"""
+    return f"{base}.parquet" if PARQUET_AVAILABLE else f"{base}.columns"
+
+def is_columnar(path):
+    """True if path is a Parquet file or a column directory"""
+    return path.endswith('.parquet') or os.path.isfile(os.path.join(path, COLUMNS_META))
+
+def write_columnar(rows, path, columns, integer_columns=(), batch_size=10000):
+    """Write rows (dicts or Message records) column by column; returns the row count
+
+    Rows are buffered `batch_size` at a time, which becomes one Parquet row
+    group. Columns in `integer_columns` are stored as integers, the rest as text.
+    If writing fails, the partial output is removed before the error propagates.
+    """
+    batch = {column: [] for column in columns}
+    count = 0
+
+    if path.endswith('.parquet'):
+        pa, pq = load_pyarrow('write')
+        schema = pa.schema([(column, pa.int64() if column in integer_columns else pa.string())
+                            for column in columns])
+        writer = pq.ParquetWriter(path, schema, compression='zstd')
+        write_batch = lambda: writer.write_table(pa.Table.from_pydict(batch, schema=schema))
+        close = writer.close
+        finish = None
+    else:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        files = {column: open(os.path.join(path, f"{column}.jsonl"), 'w', encoding='utf-8')
+                 for column in columns}
+
+        def write_batch():
+            for column, values in batch.items():
+                files[column].writelines(json.dumps(value, ensure_ascii=False) + '\n' for value in values)
+
+        def close():
+            for f in files.values():
+                f.close()
+
+        def finish():
+            # Written last, once every column is complete, so a directory without it is an interrupted write
+            with open(os.path.join(path, COLUMNS_META), 'w', encoding='utf-8') as f:
+                json.dump({'columns': columns, 'integer_columns': sorted(integer_columns), 'rows': count}, f)
+
+    try:
+        for row in rows:
+            for column in columns:
+                value = row.get(column, '')
+                if column in integer_columns:
+                    try:
+                        value = int(value or 0)
+                    except (TypeError, ValueError):
+                        value = 0
+                else:
+                    value = str(value)
+                batch[column].append(value)
+            count += 1
+            if count % batch_size == 0:
+                write_batch()
+                batch = {column: [] for column in columns}
+        if batch[columns[0]] or count == 0:
+            write_batch()
+    except BaseException:
+        close()
+        remove_columnar(path)
+        raise
+    close()
+    if finish is not None:
+        finish()
+    return count
+
+def remove_columnar(path):
+    """Delete a Parquet file or column directory if it exists"""
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+def columnar_columns(path):
+    """Column names stored in a Parquet file or column directory"""
+    if path.endswith('.parquet'):
+        _, pq = load_pyarrow('read')
+        return pq.read_schema(path).names
+    with open(os.path.join(path, COLUMNS_META), 'r', encoding='utf-8') as f:
+        return json.load(f)['columns']
+
+def read_columns(path, columns=None):
+    """Read the requested columns (all by default) as {column: list of values}"""
+    if path.endswith('.parquet'):
+        _, pq = load_pyarrow('read')
+        return pq.read_table(path, columns=columns).to_pydict()
+
+    if columns is None:
+        columns = columnar_columns(path)
+    data = {}
+    for column in columns:
+        with open(os.path.join(path, f"{column}.jsonl"), 'r', encoding='utf-8') as f:
+            data[column] = [json.loads(line) for line in f]
+    return data
+
+def read_dataframe(path, columns=None):
+    """Read the requested columns into a pandas DataFrame"""
+    if path.endswith('.parquet'):
+        _, pq = load_pyarrow('read')
+        return pq.read_table(path, columns=columns).to_pandas()
+
+    import pandas as pd
+    data = read_columns(path, columns)
+    return pd.DataFrame(data, columns=list(data))
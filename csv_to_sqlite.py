@@ -7,13 +7,29 @@ Author: Real Estate Data Processing System
 Date: 2025
 """
 
+import io
+import csv
 import sqlite3
+import hashlib
 import pandas as pd
 import sys
 import os
+import time
+import queue
+import argparse
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import logging
 
+from database_schema import (PROPERTIES_COLUMNS, ROW_HASH_COLUMN, create_database_schema, create_indexes,
+                             create_rejects_table, ensure_database_schema)
+from columnar_store import is_columnar, columnar_columns, read_dataframe
+from simple_parser import message_timestamp, sqlite_row
+from region_gazetteer import primary_region_id
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,55 +40,6 @@ logging.basicConfig(
     ]
 )
 
-def create_database_schema(cursor):
-    """Create the SQLite database schema for real estate data."""
-    
-    # Drop table if exists (for clean conversion)
-    cursor.execute("DROP TABLE IF EXISTS properties")
-    
-    # Create the main properties table
-    schema_sql = """
-    CREATE TABLE properties (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        unique_id TEXT UNIQUE,
-        file_source TEXT,
-        date TEXT,
-        time TEXT,
-        sender_name TEXT,
-        sender_phone TEXT,
-        sender_phone_2 TEXT,
-        message TEXT,
-        message_backup TEXT,
-        status TEXT,
-        region TEXT,
-        property_type TEXT,
-        line_number INTEGER,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        
-        -- Indexes for better performance
-        UNIQUE(unique_id)
-    )
-    """
-    
-    cursor.execute(schema_sql)
-    
-    # Create indexes for better query performance
-    indexes = [
-        "CREATE INDEX idx_date ON properties(date)",
-        "CREATE INDEX idx_time ON properties(time)",
-        "CREATE INDEX idx_sender_name ON properties(sender_name)",
-        "CREATE INDEX idx_sender_phone ON properties(sender_phone)",
-        "CREATE INDEX idx_region ON properties(region)",
-        "CREATE INDEX idx_property_type ON properties(property_type)",
-        "CREATE INDEX idx_file_source ON properties(file_source)",
-        "CREATE INDEX idx_unique_id ON properties(unique_id)"
-    ]
-    
-    for index_sql in indexes:
-        cursor.execute(index_sql)
-    
-    logging.info("Database schema created successfully")
-
 def clean_data(df):
     """Clean and prepare the DataFrame for database insertion."""
     
@@ -102,15 +69,151 @@ def clean_data(df):
         if col in df.columns:
             df[col] = df[col].astype(str).str.replace(r'[^\d+]', '', regex=True)
     
+    # Sortable ISO timestamp; CSVs written before the parser emitted `ts` get it from date/time
+    if 'ts' not in df.columns and 'date' in df.columns and 'time' in df.columns:
+        df['ts'] = [message_timestamp(str(date), str(time)) for date, time in zip(df['date'], df['time'])]
+    
+    # Canonical region ID from the gazetteer, for CSVs written before the parser emitted it
+    if 'region_id' not in df.columns and 'message_backup' in df.columns:
+        df['region_id'] = [primary_region_id(str(text)) for text in df['message_backup']]
+    
     # Convert line_number to integer
     if 'line_number' in df.columns:
         df['line_number'] = pd.to_numeric(df['line_number'], errors='coerce').fillna(0).astype(int)
     
+    # Repost flag from `simple_parser.py --reposts flag`
+    if 'is_repost' in df.columns:
+        df['is_repost'] = pd.to_numeric(df['is_repost'], errors='coerce').fillna(0).astype(int)
+    
     logging.info(f"Data cleaning completed. Final shape: {df.shape}")
     return df
 
-def import_csv_to_sqlite(csv_file, db_file, chunk_size=10000):
-    """Import CSV data to SQLite database in chunks for memory efficiency."""
+def read_columnar_chunks(path, chunk_size):
+    """Read the properties columns of a columnar parser output in DataFrame chunks."""
+    columns = [column for column in columnar_columns(path) if column in PROPERTIES_COLUMNS]
+    df = read_dataframe(path, columns=columns)
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+# Errors caused by the data in a row (a constraint, a value that cannot be
+# bound); anything else (a locked or missing database, a full disk) is not
+# a bad row and would only fail again on every half
+ROW_ERRORS = (sqlite3.IntegrityError, sqlite3.InterfaceError, ValueError, TypeError)
+
+# Host parameters one SQLite statement may bind when the connection cannot be
+# asked (Connection.getlimit needs Python 3.11); 999 is the limit of SQLite
+# builds before 3.32, later ones allow 32766
+SQLITE_MAX_VARIABLES = 999
+
+def max_variables(conn):
+    """Number of host parameters one statement on conn may bind."""
+    if hasattr(conn, 'getlimit'):
+        return conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    return SQLITE_MAX_VARIABLES
+
+def insert_bisecting(insert, rows, reject):
+    """Insert rows, isolating the ones that fail by splitting the batch in half.
+    
+    `insert(rows)` must be atomic: a failed call leaves nothing behind. When
+    it fails with one of ROW_ERRORS, each half is retried on its own, so a
+    bad row in a batch of n is found in about 2*log2(n) inserts and the good
+    rows around it still go in. A single failing row is passed to
+    `reject(rows, error)`; any other error propagates.
+    Returns (rows inserted, rows rejected).
+    """
+    try:
+        insert(rows)
+        return len(rows), 0
+    except ROW_ERRORS as e:
+        if len(rows) == 1:
+            reject(rows, e)
+            return 0, 1
+        middle = len(rows) // 2
+        first_inserted, first_rejected = insert_bisecting(insert, rows[:middle], reject)
+        second_inserted, second_rejected = insert_bisecting(insert, rows[middle:], reject)
+        return first_inserted + second_inserted, first_rejected + second_rejected
+
+def reject_row(conn, source, row_df, error):
+    """Record a one-row DataFrame that could not be inserted in properties_rejects."""
+    unique_id = str(row_df['unique_id'].iloc[0]) if 'unique_id' in row_df.columns else ''
+    row_data = row_df.to_json(orient='records', force_ascii=False)[1:-1]
+    conn.execute("INSERT INTO properties_rejects (unique_id, source, row_data, error) VALUES (?, ?, ?, ?)",
+                 (unique_id, source, row_data, str(error)))
+    conn.commit()
+    logging.error(f"Rejected row {unique_id or '(no unique_id)'}: {error}")
+
+def cleaned_chunks(chunks, workers=1):
+    """clean_data() applied to each chunk, yielded in input order
+    
+    With workers, chunks are cleaned in a process pool. At most two chunks
+    per worker are in flight (unlike executor.map, which would read the
+    whole input ahead), and results are taken in submission order.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield clean_data(chunk)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(clean_data, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def write_chunks(db_file, source, chunk_queue, total_rows, state):
+    """Writer thread: insert the cleaned chunks from chunk_queue until None arrives.
+    
+    This thread owns the only connection that writes rows, so chunks are
+    inserted one at a time in the order they were queued. Counts and any
+    error are left in `state`. After an error the queue is still drained,
+    so the producer never blocks on a full queue.
+    """
+    conn = sqlite3.connect(db_file)
+    variable_limit = max_variables(conn)
+    chunk_num = 0
+    try:
+        while True:
+            chunk = chunk_queue.get()
+            if chunk is None:
+                break
+            if state['error'] is not None:
+                continue
+            chunk_num += 1
+            logging.info(f"Writing chunk {chunk_num} ({len(chunk)} rows)")
+            try:
+                # to_sql commits each call or rolls it back whole, so a failing
+                # chunk is bisected down to its bad rows; each multi-row INSERT
+                # binds at most variable_limit values
+                inserted, rejected = insert_bisecting(
+                    lambda rows: rows.to_sql('properties', conn, if_exists='append', index=False, method='multi',
+                                             chunksize=max(1, variable_limit // len(rows.columns))),
+                    chunk,
+                    lambda rows, error: reject_row(conn, source, rows, error))
+            except Exception as e:
+                state['error'] = e
+                continue
+            state['inserted'] += inserted
+            state['rejected'] += rejected
+            
+            done = state['inserted'] + state['rejected']
+            logging.info(f"Progress: {done:,}/{total_rows:,} ({done / max(total_rows, 1) * 100:.1f}%)")
+    finally:
+        conn.close()
+
+def import_csv_to_sqlite(csv_file, db_file, chunk_size=10000, workers=1, queue_size=4):
+    """Import CSV data to SQLite database in chunks for memory efficiency.
+    
+    `csv_file` may also be a columnar output (whatsapp_chats.parquet or a
+    .columns directory); only the properties table columns are read from it.
+    
+    Chunks are cleaned in this thread (or in `workers` processes) and handed
+    to a single writer thread through a queue of at most `queue_size`
+    chunks, so cleaning and inserting overlap while memory stays bounded.
+    Rows are written in input order whatever the number of workers.
+    """
     
     if not os.path.exists(csv_file):
         logging.error(f"CSV file not found: {csv_file}")
@@ -123,76 +226,303 @@ def import_csv_to_sqlite(csv_file, db_file, chunk_size=10000):
         
         # Create schema
         create_database_schema(cursor)
+        create_rejects_table(cursor)
+        conn.commit()
         
         # Get total rows for progress tracking
-        total_rows = sum(1 for line in open(csv_file, 'r', encoding='utf-8')) - 1  # subtract header
+        if is_columnar(csv_file):
+            chunks = list(read_columnar_chunks(csv_file, chunk_size))
+            total_rows = sum(len(chunk) for chunk in chunks)
+        else:
+            chunks = pd.read_csv(csv_file, chunksize=chunk_size, encoding='utf-8')
+            total_rows = sum(1 for line in open(csv_file, 'r', encoding='utf-8')) - 1  # subtract header
         logging.info(f"Total rows to process: {total_rows:,}")
         
-        processed_rows = 0
-        chunk_num = 0
+        if workers > 1:
+            logging.info(f"Cleaning chunks in {workers} worker processes")
         
-        # Process CSV in chunks
-        for chunk in pd.read_csv(csv_file, chunksize=chunk_size, encoding='utf-8'):
-            chunk_num += 1
-            logging.info(f"Processing chunk {chunk_num} ({len(chunk)} rows)")
-            
-            # Clean the chunk
-            chunk_cleaned = clean_data(chunk)
+        # Clean chunks here (or in the pool) while the writer thread inserts the previous ones;
+        # put() blocks while the queue is full, which holds back reading and cleaning
+        state = {'inserted': 0, 'rejected': 0, 'error': None}
+        chunk_queue = queue.Queue(maxsize=queue_size)
+        writer = threading.Thread(target=write_chunks, name='sqlite-writer',
+                                  args=(db_file, csv_file, chunk_queue, total_rows, state))
+        writer.start()
+        try:
+            for chunk_cleaned in cleaned_chunks(chunks, workers):
+                if state['error'] is not None:
+                    break
+                chunk_queue.put(chunk_cleaned)
+        finally:
+            chunk_queue.put(None)
+            writer.join()
+        if state['error'] is not None:
+            raise state['error']
+        
+        log_import_statistics(cursor, state['inserted'])
+        if state['rejected']:
+            logging.warning(f"{state['rejected']:,} rows rejected, see the properties_rejects table")
+        
+        cursor.close()
+        conn.close()
+        
+        return True
+        
+    except Exception as e:
+        logging.error(f"Error during conversion: {e}")
+        return False
+
+def log_import_statistics(cursor, processed_rows):
+    """Verify the row count and log a few statistics of the loaded table."""
+    cursor.execute("SELECT COUNT(*) FROM properties")
+    db_count = cursor.fetchone()[0]
+    
+    logging.info(f"Import completed successfully!")
+    logging.info(f"Records in database: {db_count:,}")
+    logging.info(f"Records processed: {processed_rows:,}")
+    
+    # Get some statistics
+    cursor.execute("SELECT COUNT(DISTINCT sender_name) FROM properties WHERE sender_name != ''")
+    unique_senders = cursor.fetchone()[0]
+    
+    cursor.execute("SELECT COUNT(DISTINCT region) FROM properties WHERE region != ''")
+    unique_regions = cursor.fetchone()[0]
+    
+    cursor.execute("SELECT COUNT(DISTINCT property_type) FROM properties WHERE property_type != ''")
+    unique_property_types = cursor.fetchone()[0]
+    
+    logging.info(f"Statistics:")
+    logging.info(f"  - Unique senders: {unique_senders:,}")
+    logging.info(f"  - Unique regions: {unique_regions:,}")
+    logging.info(f"  - Unique property types: {unique_property_types:,}")
+
+# Load-time settings for --fast: no rollback journal, no fsyncs, a large page
+# cache for the index builds. A crash mid-load leaves a broken database, which
+# is fine for a fresh build (main() moves the previous database aside first).
+FAST_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -262144",
+    "PRAGMA temp_store = MEMORY",
+]
+# Normal settings restored once the load is done
+NORMAL_PRAGMAS = [
+    "PRAGMA journal_mode = DELETE",
+    "PRAGMA synchronous = FULL",
+]
+
+def properties_columns(header):
+    """Properties columns filled from an input with these columns
+    
+    `ts` and `region_id` are included even when missing, as they are derived.
+    """
+    columns = [column for column in PROPERTIES_COLUMNS
+               if column in header or column == 'ts' or (column == 'region_id' and 'message_backup' in header)]
+    if 'unique_id' not in columns:
+        columns.insert(0, 'unique_id')
+    return columns
+
+def row_hash(row):
+    """Content hash of a cleaned properties row, stored in row_hash"""
+    text = '\x1f'.join(str(value) for value in row)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+def csv_rows(reader, header, columns):
+    """Rows of a parser CSV as properties tuples, cleaned like clean_data()
+    
+    Missing `ts` / `region_id` columns are derived as in clean_data(). Each
+    tuple ends with the row's content hash, for the row_hash column.
+    """
+    derive_ts = 'ts' not in header
+    derive_region_id = 'region_id' not in header
+    generated = 0
+    for values in reader:
+        row = dict(zip(header, values))
+        if not row.get('unique_id'):
+            row['unique_id'] = f"generated_{generated}"
+            generated += 1
+        if derive_ts:
+            row['ts'] = message_timestamp(row.get('date', ''), row.get('time', ''))
+        if derive_region_id:
+            row['region_id'] = primary_region_id(row.get('message_backup', ''))
+        row = sqlite_row(row, columns)
+        yield row + (row_hash(row),)
+
+def fast_import_csv_to_sqlite(csv_file, db_file, batch_size=10000):
+    """Bulk-load a CSV: one transaction, indexes built after the data is in.
+    
+    Rows stream from the csv module into executemany with the journal and
+    fsyncs off; then the indexes are created and ANALYZE gathers planner
+    statistics. Progress is reported from the bytes read, so the file is
+    never read twice. A row that repeats an earlier unique_id updates that
+    row (the last one wins) instead of aborting the load.
+    """
+    
+    if not os.path.exists(csv_file):
+        logging.error(f"CSV file not found: {csv_file}")
+        return False
+    
+    total_bytes = max(os.path.getsize(csv_file), 1)
+    conn = None
+    try:
+        # Autocommit mode: transactions are opened and closed explicitly below
+        conn = sqlite3.connect(db_file, isolation_level=None)
+        cursor = conn.cursor()
+        for pragma in FAST_LOAD_PRAGMAS:
+            cursor.execute(pragma)
+        create_database_schema(cursor, indexes=False)
+        
+        started = time.perf_counter()
+        processed_rows = 0
+        with open(csv_file, 'rb') as raw:
+            # Long multi-line ads can exceed the csv module's default 128 KB field limit
+            csv.field_size_limit(max(csv.field_size_limit(), total_bytes))
+            reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+            header = next(reader, [])
+            columns = properties_columns(header)
+            insert_columns = columns + [ROW_HASH_COLUMN]
+            # A unique_id seen twice keeps its first row's position with the last row's content,
+            # as when simple_parser --output sqlite upserts a re-written message
+            updates = ', '.join(f"{column} = excluded.{column}" for column in insert_columns if column != 'unique_id')
+            insert_sql = (f"INSERT INTO properties ({', '.join(insert_columns)}) VALUES ({', '.join('?' * len(insert_columns))}) "
+                          f"ON CONFLICT(unique_id) DO UPDATE SET {updates}")
+            logging.info(f"Fast load: {total_bytes / (1024 * 1024):.1f} MB, columns: {', '.join(columns)}")
             
-            # Insert into database
-            try:
-                chunk_cleaned.to_sql('properties', conn, if_exists='append', index=False, method='multi')
-                processed_rows += len(chunk_cleaned)
-                
-                progress = (processed_rows / total_rows) * 100
-                logging.info(f"Progress: {processed_rows:,}/{total_rows:,} ({progress:.1f}%)")
+            rows = csv_rows(reader, header, columns)
+            next_report = 0.1
+            cursor.execute("BEGIN")
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                cursor.executemany(insert_sql, batch)
+                processed_rows += len(batch)
                 
-            except Exception as e:
-                logging.error(f"Error inserting chunk {chunk_num}: {e}")
-                # Try to insert row by row to identify problematic records
-                for idx, row in chunk_cleaned.iterrows():
-                    try:
-                        row_df = pd.DataFrame([row])
-                        row_df.to_sql('properties', conn, if_exists='append', index=False)
-                        processed_rows += 1
-                    except Exception as row_error:
-                        logging.error(f"Error inserting row {idx}: {row_error}")
-                        logging.error(f"Problematic row data: {row.to_dict()}")
+                # Bytes handed to the CSV reader so far (read ahead in small blocks)
+                done = raw.tell() / total_bytes
+                if done >= next_report:
+                    elapsed = time.perf_counter() - started
+                    logging.info(f"Progress: {done:.0%} of input, {processed_rows:,} rows "
+                                 f"({processed_rows / elapsed:,.0f} rows/s, {raw.tell() / elapsed / (1024 * 1024):.1f} MB/s)")
+                    next_report = int(done * 10 + 1) / 10
+            cursor.execute("COMMIT")
+        logging.info(f"Inserted {processed_rows:,} rows in {time.perf_counter() - started:.1f}s")
         
-        # Commit all changes
-        conn.commit()
+        step_started = time.perf_counter()
+        cursor.execute("BEGIN")
+        create_indexes(cursor)
+        cursor.execute("COMMIT")
+        cursor.execute("ANALYZE")
+        logging.info(f"Indexes and ANALYZE: {time.perf_counter() - step_started:.1f}s")
         
-        # Verify the import
-        cursor.execute("SELECT COUNT(*) FROM properties")
-        db_count = cursor.fetchone()[0]
+        for pragma in NORMAL_PRAGMAS:
+            cursor.execute(pragma)
         
-        logging.info(f"Import completed successfully!")
-        logging.info(f"Records in database: {db_count:,}")
-        logging.info(f"Records processed: {processed_rows:,}")
+        log_import_statistics(cursor, processed_rows)
+        duplicates = processed_rows - cursor.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
+        if duplicates:
+            logging.warning(f"{duplicates:,} rows repeated an earlier unique_id; the last row of each was kept")
+        cursor.close()
+        return True
         
-        # Get some statistics
-        cursor.execute("SELECT COUNT(DISTINCT sender_name) FROM properties WHERE sender_name != ''")
-        unique_senders = cursor.fetchone()[0]
+    except Exception as e:
+        logging.error(f"Error during fast load: {e}")
+        return False
+    finally:
+        if conn is not None:
+            conn.close()
+
+def input_rows(path, header, columns):
+    """Cleaned properties rows (ending with their row_hash) of a parser CSV or columnar output"""
+    if is_columnar(path):
+        for chunk in read_columnar_chunks(path, 10000):
+            for record in clean_data(chunk).to_dict('records'):
+                row = sqlite_row(record, columns)
+                yield row + (row_hash(row),)
+        return
+    
+    csv.field_size_limit(max(csv.field_size_limit(), os.path.getsize(path)))
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        yield from csv_rows(reader, header, columns)
+
+def read_input_header(path):
+    """Column names of a parser CSV or columnar output"""
+    if is_columnar(path):
+        return columnar_columns(path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f), [])
+
+def incremental_import_csv_to_sqlite(csv_file, db_file, delete_missing=False, batch_size=10000):
+    """Upsert a parser output into an existing database, touching only changed rows.
+    
+    Rows are matched on unique_id and compared on row_hash: new rows are
+    inserted, rows whose content changed are updated and unchanged rows are
+    not written at all, so their indexes are left alone. With delete_missing,
+    rows whose unique_id is no longer in the input are deleted. Everything
+    runs in one transaction, so a failed run changes nothing.
+    """
+    
+    if not os.path.exists(csv_file):
+        logging.error(f"CSV file not found: {csv_file}")
+        return False
+    
+    conn = None
+    try:
+        conn = sqlite3.connect(db_file)
+        cursor = conn.cursor()
+        ensure_database_schema(cursor)
+        rows_before = cursor.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
         
-        cursor.execute("SELECT COUNT(DISTINCT region) FROM properties WHERE region != ''")
-        unique_regions = cursor.fetchone()[0]
+        header = read_input_header(csv_file)
+        columns = properties_columns(header)
+        insert_columns = columns + [ROW_HASH_COLUMN]
+        updates = ', '.join(f"{column} = excluded.{column}" for column in insert_columns if column != 'unique_id')
+        upsert_sql = (f"INSERT INTO properties ({', '.join(insert_columns)}) VALUES ({', '.join('?' * len(insert_columns))}) "
+                      f"ON CONFLICT(unique_id) DO UPDATE SET {updates} "
+                      f"WHERE properties.{ROW_HASH_COLUMN} IS NOT excluded.{ROW_HASH_COLUMN}")
+        logging.info(f"Incremental import into {db_file} ({rows_before:,} existing rows)")
         
-        cursor.execute("SELECT COUNT(DISTINCT property_type) FROM properties WHERE property_type != ''")
-        unique_property_types = cursor.fetchone()[0]
+        if delete_missing:
+            # unique_ids seen in the input, to find the rows that vanished from it
+            cursor.execute("CREATE TEMP TABLE seen_ids (unique_id TEXT PRIMARY KEY)")
+        unique_id_index = columns.index('unique_id')
         
-        logging.info(f"Statistics:")
-        logging.info(f"  - Unique senders: {unique_senders:,}")
-        logging.info(f"  - Unique regions: {unique_regions:,}")
-        logging.info(f"  - Unique property types: {unique_property_types:,}")
+        processed_rows = 0
+        changed_rows = 0
+        rows = input_rows(csv_file, header, columns)
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            # rowcount only counts inserted rows and rows the WHERE clause let through
+            cursor.executemany(upsert_sql, batch)
+            changed_rows += cursor.rowcount
+            if delete_missing:
+                cursor.executemany("INSERT OR IGNORE INTO seen_ids VALUES (?)", [(row[unique_id_index],) for row in batch])
+            processed_rows += len(batch)
         
-        cursor.close()
-        conn.close()
+        inserted = cursor.execute("SELECT COUNT(*) FROM properties").fetchone()[0] - rows_before
+        deleted = 0
+        if delete_missing:
+            cursor.execute("DELETE FROM properties WHERE unique_id NOT IN (SELECT unique_id FROM seen_ids)")
+            deleted = cursor.rowcount
+        conn.commit()
         
+        logging.info(f"Incremental import completed: {processed_rows:,} input rows")
+        logging.info(f"  - Inserted: {inserted:,}")
+        logging.info(f"  - Updated: {changed_rows - inserted:,}")
+        logging.info(f"  - Unchanged: {processed_rows - changed_rows:,}")
+        logging.info(f"  - Deleted: {deleted:,}" if delete_missing else "  - Deleted: 0 (no --delete-missing)")
         return True
         
     except Exception as e:
-        logging.error(f"Error during conversion: {e}")
+        logging.error(f"Error during incremental import: {e}")
         return False
+    finally:
+        if conn is not None:
+            conn.close()
 
 def create_sample_queries_file():
     """Create a file with sample SQL queries for the database."""
@@ -232,12 +562,18 @@ FROM properties
 WHERE message LIKE '%شقة%' OR message LIKE '%apartment%'
 LIMIT 50;
 
--- 6. Get properties by date range
-SELECT date, COUNT(*) as count
+-- 6. Get properties by date range (ts is ISO 8601, so the range and ordering use idx_ts)
+SELECT substr(ts, 1, 10) as day, COUNT(*) as count
 FROM properties 
-WHERE date != ''
-GROUP BY date 
-ORDER BY date DESC;
+WHERE ts >= '2025-06-01' AND ts < '2025-07-01'
+GROUP BY day 
+ORDER BY day DESC;
+
+-- 6b. Latest properties in chronological order
+SELECT unique_id, sender_name, region, property_type, ts
+FROM properties 
+ORDER BY ts DESC
+LIMIT 50;
 
 -- 7. Find properties with phone numbers
 SELECT sender_name, sender_phone, message
@@ -251,10 +587,17 @@ FROM properties
 GROUP BY file_source 
 ORDER BY count DESC;
 
+-- 8b. Properties in one region by canonical ID (equality, uses idx_region_id)
+SELECT unique_id, sender_name, region, property_type, ts
+FROM properties 
+WHERE region_id = 'obour'
+ORDER BY ts DESC
+LIMIT 50;
+
 -- 9. Advanced search with multiple criteria
 SELECT *
 FROM properties 
-WHERE region LIKE '%القاهرة%' 
+WHERE region_id = 'cairo' 
   AND property_type != ''
   AND message LIKE '%للبيع%'
 LIMIT 30;
@@ -274,35 +617,62 @@ ORDER BY created_at DESC;
 def main():
     """Main function to run the CSV to SQLite conversion."""
     
-    csv_file = 'whatsapp_chats.csv'
+    parser = argparse.ArgumentParser(description="CSV to SQLite Converter")
+    # Optional input path, e.g. whatsapp_chats.parquet from `simple_parser.py --output parquet`
+    parser.add_argument('input', nargs='?', default='whatsapp_chats.csv',
+                        help="parser CSV or columnar output (default: whatsapp_chats.csv)")
+    parser.add_argument('--fast', action='store_true',
+                        help="bulk-load a CSV in one transaction with journaling off and indexes built afterwards")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of processes cleaning chunks for the default loader (default: 1)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="upsert into the existing database, writing only new and changed rows")
+    parser.add_argument('--delete-missing', action='store_true',
+                        help="with --incremental, delete rows whose unique_id is no longer in the input")
+    args = parser.parse_args()
+    if args.fast and args.incremental:
+        parser.error("--fast rebuilds the database; it cannot be combined with --incremental")
+    if args.delete_missing and not args.incremental:
+        parser.error("--delete-missing requires --incremental")
+    csv_file = args.input
     db_file = 'real_estate_data.db'
     
     logging.info("Starting CSV to SQLite conversion")
-    logging.info(f"Input CSV: {csv_file}")
+    logging.info(f"Input: {csv_file}")
     logging.info(f"Output DB: {db_file}")
     
-    # Create backup if database already exists
-    if os.path.exists(db_file):
+    # Create backup if database already exists (an incremental import updates it in place)
+    if os.path.exists(db_file) and not args.incremental:
         backup_name = f"real_estate_data_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         os.rename(db_file, backup_name)
         logging.info(f"Existing database backed up as: {backup_name}")
     
     # Perform the conversion
-    success = import_csv_to_sqlite(csv_file, db_file)
+    if args.incremental:
+        success = incremental_import_csv_to_sqlite(csv_file, db_file, args.delete_missing)
+    elif args.fast and not is_columnar(csv_file):
+        success = fast_import_csv_to_sqlite(csv_file, db_file)
+    else:
+        if args.fast:
+            logging.info("--fast loads CSV files; reading the columnar input in chunks instead")
+        success = import_csv_to_sqlite(csv_file, db_file, workers=args.workers)
     
     if success:
         logging.info("✅ Conversion completed successfully!")
-        logging.info(f"SQLite database created: {db_file}")
+        logging.info(f"SQLite database {'updated' if args.incremental else 'created'}: {db_file}")
         
         # Create sample queries file
         create_sample_queries_file()
         
         # Display file sizes
-        csv_size = os.path.getsize(csv_file) / (1024 * 1024)  # MB
+        if os.path.isdir(csv_file):
+            csv_size = sum(os.path.getsize(os.path.join(csv_file, name)) for name in os.listdir(csv_file)) / (1024 * 1024)
+        else:
+            csv_size = os.path.getsize(csv_file) / (1024 * 1024)  # MB
         db_size = os.path.getsize(db_file) / (1024 * 1024)   # MB
         
         logging.info(f"File sizes:")
-        logging.info(f"  - CSV: {csv_size:.1f} MB")
+        logging.info(f"  - Input: {csv_size:.1f} MB")
         logging.info(f"  - SQLite DB: {db_size:.1f} MB")
         logging.info(f"  - Compression ratio: {(csv_size/db_size):.1f}x")
         
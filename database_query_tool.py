@@ -73,7 +73,7 @@ class RealEstateDB:
         SELECT unique_id, sender_name, region, property_type, message, date, time
         FROM properties 
         WHERE message LIKE ? OR region LIKE ? OR property_type LIKE ?
-        ORDER BY date DESC, time DESC
+        ORDER BY ts DESC
         LIMIT ?
         """
         keyword_pattern = f"%{keyword}%"
@@ -85,7 +85,7 @@ class RealEstateDB:
         SELECT unique_id, sender_name, property_type, message, date, time
         FROM properties 
         WHERE region LIKE ?
-        ORDER BY date DESC, time DESC
+        ORDER BY ts DESC
         LIMIT ?
         """
         return self.execute_query(query, (f"%{region}%", limit))
@@ -96,7 +96,7 @@ class RealEstateDB:
         SELECT unique_id, region, property_type, message, date, time
         FROM properties 
         WHERE sender_name LIKE ?
-        ORDER BY date DESC, time DESC
+        ORDER BY ts DESC
         LIMIT ?
         """
         return self.execute_query(query, (f"%{sender_name}%", limit))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+SQLite schema for the real estate `properties` table.
+Shared by csv_to_sqlite.py and simple_parser.py (direct SQLite output).
+
+Author: Real Estate Data Processing System
+Date: 2025
+"""
+
+import logging
+
+# Columns filled from parsed messages, in CSV order
+PROPERTIES_COLUMNS = [
+    'unique_id', 'file_source', 'date', 'time', 'ts', 'sender_name', 'sender_phone', 'sender_phone_2',
+    'message', 'message_backup', 'status', 'region', 'region_id', 'property_type', 'line_number', 'is_repost'
+]
+
+PROPERTIES_TABLE_SQL = """
+CREATE TABLE properties (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    unique_id TEXT UNIQUE,
+    file_source TEXT,
+    date TEXT,
+    time TEXT,
+    ts TEXT,
+    sender_name TEXT,
+    sender_phone TEXT,
+    sender_phone_2 TEXT,
+    message TEXT,
+    message_backup TEXT,
+    status TEXT,
+    region TEXT,
+    region_id TEXT,
+    property_type TEXT,
+    line_number INTEGER,
+    is_repost INTEGER DEFAULT 0,
+    row_hash TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    -- Indexes for better performance
+    UNIQUE(unique_id)
+)
+"""
+
+# Content hash of the other columns, used by incremental imports to skip unchanged rows
+ROW_HASH_COLUMN = 'row_hash'
+
+# Indexes for better query performance
+PROPERTIES_INDEXES = [
+    "CREATE INDEX idx_date ON properties(date)",
+    "CREATE INDEX idx_time ON properties(time)",
+    "CREATE INDEX idx_ts ON properties(ts)",
+    "CREATE INDEX idx_sender_name ON properties(sender_name)",
+    "CREATE INDEX idx_sender_phone ON properties(sender_phone)",
+    "CREATE INDEX idx_region ON properties(region)",
+    "CREATE INDEX idx_region_id ON properties(region_id)",
+    "CREATE INDEX idx_property_type ON properties(property_type)",
+    "CREATE INDEX idx_file_source ON properties(file_source)",
+    "CREATE INDEX idx_unique_id ON properties(unique_id)"
+]
+
+# Rows the importer could not insert, kept for review with the database error
+PROPERTIES_REJECTS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS properties_rejects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    unique_id TEXT,
+    source TEXT,
+    row_data TEXT,
+    error TEXT,
+    rejected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+def create_database_schema(cursor, indexes=True):
+    """Create the SQLite database schema for real estate data.
+
+    Bulk loads pass indexes=False and call create_indexes() once the rows are
+    in, which is much faster than updating every index on each insert.
+    """
+
+    # Drop table if exists (for clean conversion)
+    cursor.execute("DROP TABLE IF EXISTS properties")
+
+    # Create the main properties table
+    cursor.execute(PROPERTIES_TABLE_SQL)
+
+    if indexes:
+        create_indexes(cursor)
+
+    logging.info("Database schema created successfully")
+
+def create_indexes(cursor):
+    """Create the secondary indexes of the properties table."""
+    for index_sql in PROPERTIES_INDEXES:
+        cursor.execute(index_sql)
+
+def ensure_database_schema(cursor):
+    """Create the properties table and its indexes if missing, keeping existing rows.
+
+    Columns added to the schema after a database was built (such as ts,
+    region_id or row_hash) are added with ALTER TABLE.
+    """
+    cursor.execute(PROPERTIES_TABLE_SQL.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(properties)")}
+    for line in PROPERTIES_TABLE_SQL.splitlines():
+        column, _, definition = line.strip().rstrip(',').partition(' ')
+        if column in PROPERTIES_COLUMNS + [ROW_HASH_COLUMN] and column not in existing:
+            cursor.execute(f"ALTER TABLE properties ADD COLUMN {column} {definition}")
+            logging.info(f"Added missing column: {column}")
+
+    for index_sql in PROPERTIES_INDEXES:
+        cursor.execute(index_sql.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1))
+
+def create_rejects_table(cursor):
+    """Create the properties_rejects table if missing (row_data holds the rejected row as JSON)."""
+    cursor.execute(PROPERTIES_REJECTS_TABLE_SQL)
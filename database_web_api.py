@@ -13,6 +13,10 @@ import json
 import os
 from datetime import datetime
 
+from simple_parser import message_timestamp
+from region_gazetteer import primary_region_id
+from database_schema import ensure_database_schema
+
 app = Flask(__name__)
 
 # Enable CORS for all routes
@@ -45,6 +49,42 @@ def check_database():
     except Exception as e:
         return False, f"Database connection error: {str(e)}"
 
+def migrate_database(db_path=DB_PATH, batch_size=5000):
+    """Bring a database built before the ts/region_id columns up to the current schema.
+    
+    ensure_database_schema adds missing columns (NULL in existing rows) and
+    indexes; rows whose ts or region_id is still NULL get them from their
+    date/time and message text. Returns the number of rows backfilled.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        ensure_database_schema(cursor)
+        conn.commit()
+        
+        backfilled = 0
+        last_id = 0
+        while True:
+            rows = cursor.execute("""
+                SELECT id, date, time, message, message_backup, ts, region_id FROM properties
+                WHERE (ts IS NULL OR region_id IS NULL) AND id > ?
+                ORDER BY id LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            cursor.executemany("UPDATE properties SET ts = ?, region_id = ? WHERE id = ?", [
+                (ts if ts is not None else message_timestamp(date or '', time or ''),
+                 region_id if region_id is not None else primary_region_id(message_backup or message or ''),
+                 row_id)
+                for row_id, date, time, message, message_backup, ts, region_id in rows
+            ])
+            conn.commit()
+            backfilled += len(rows)
+            last_id = rows[-1][0]
+        return backfilled
+    finally:
+        conn.close()
+
 def get_db_connection():
     """Get database connection."""
     if not os.path.exists(DB_PATH):
@@ -206,7 +246,7 @@ def index():
             <div class="endpoint">
                 <span class="method">GET</span>
                 <code>/api/properties</code> - Get all properties with pagination and filtering
-                <br><small>Parameters: page, limit, region, property_type, sender, search</small>
+                <br><small>Parameters: page, limit, region, region_id (canonical, e.g. obour), property_type, sender, search, date_from, date_to (yyyy-mm-dd)</small>
             </div>
             
             <div class="endpoint">
@@ -248,6 +288,11 @@ def index():
                 <code>/api/regions</code> - Get all regions with counts
             </div>
             
+            <div class="endpoint">
+                <span class="method">GET</span>
+                <code>/api/region_ids</code> - Get canonical region IDs with counts
+            </div>
+            
             <div class="endpoint">
                 <span class="method">GET</span>
                 <code>/api/regions/{region}/properties</code> - Get properties by region
@@ -347,8 +392,11 @@ def get_properties():
     
     # Get filter parameters
     region_filter = request.args.get('region', '')
+    region_id_filter = request.args.get('region_id', '')
     property_type_filter = request.args.get('property_type', '')
     sender_filter = request.args.get('sender', '')
+    date_from = request.args.get('date_from', '')  # yyyy-mm-dd, inclusive
+    date_to = request.args.get('date_to', '')      # yyyy-mm-dd, inclusive
     search_query = request.args.get('search', '')
     
     # Build WHERE clause
@@ -359,6 +407,11 @@ def get_properties():
         where_conditions.append("region LIKE ?")
         params.append(f"%{region_filter}%")
     
+    # Canonical IDs are matched by equality, which uses idx_region_id
+    if region_id_filter:
+        where_conditions.append("region_id = ?")
+        params.append(region_id_filter)
+    
     if property_type_filter:
         where_conditions.append("property_type LIKE ?")
         params.append(f"%{property_type_filter}%")
@@ -367,6 +420,15 @@ def get_properties():
         where_conditions.append("sender_name LIKE ?")
         params.append(f"%{sender_filter}%")
     
+    # ts is ISO 8601 text, so date ranges are plain string comparisons on idx_ts
+    if date_from:
+        where_conditions.append("ts >= ?")
+        params.append(date_from)
+    
+    if date_to:
+        where_conditions.append("ts <= ?")
+        params.append(f"{date_to}T23:59:59")
+    
     if search_query:
         # Enhanced smart search logic
         cleaned_search = search_query.strip().lower()
@@ -425,10 +487,10 @@ def get_properties():
         where_clause = "WHERE " + " AND ".join(where_conditions)
     
     query = f"""
-    SELECT unique_id, sender_name, sender_phone, sender_phone_2, region, property_type, message, date, time
+    SELECT unique_id, sender_name, sender_phone, sender_phone_2, region, region_id, property_type, message, date, time, ts
     FROM properties 
     {where_clause}
-    ORDER BY date DESC, time DESC
+    ORDER BY ts DESC
     LIMIT ? OFFSET ?
     """
     
@@ -574,7 +636,7 @@ def search_properties():
     final_condition = " AND ".join(search_conditions)
     
     sql = f"""
-    SELECT unique_id, sender_name, sender_phone, sender_phone_2, region, property_type, message, date, time,
+    SELECT unique_id, sender_name, sender_phone, sender_phone_2, region, region_id, property_type, message, date, time, ts,
            CASE 
                WHEN message LIKE ? OR region LIKE ? THEN 10
                WHEN sender_name LIKE ? THEN 8
@@ -584,7 +646,7 @@ def search_properties():
            END as relevance_score
     FROM properties 
     WHERE {final_condition}
-    ORDER BY relevance_score DESC, date DESC, time DESC
+    ORDER BY relevance_score DESC, ts DESC
     LIMIT ?
     """
     
@@ -624,16 +686,36 @@ def get_regions():
         'data': regions
     })
 
+@app.route('/api/region_ids')
+def get_region_ids():
+    """Get canonical region IDs with property counts."""
+    query = """
+    SELECT region_id, COUNT(*) as count
+    FROM properties 
+    WHERE region_id != ''
+    GROUP BY region_id 
+    ORDER BY count DESC
+    LIMIT ?
+    """
+    
+    limit = min(int(request.args.get('limit', 100)), 1000)
+    region_ids = execute_query(query, (limit,))
+    
+    return jsonify({
+        'status': 'success',
+        'data': region_ids
+    })
+
 @app.route('/api/regions/<region_name>/properties')
 def get_properties_by_region(region_name):
     """Get properties for a specific region."""
     limit = min(int(request.args.get('limit', 50)), 1000)
     
     query = """
-    SELECT unique_id, sender_name, sender_phone, sender_phone_2, property_type, message, date, time
+    SELECT unique_id, sender_name, sender_phone, sender_phone_2, property_type, message, date, time, ts
     FROM properties 
     WHERE region LIKE ?
-    ORDER BY date DESC, time DESC
+    ORDER BY ts DESC
     LIMIT ?
     """
     
@@ -686,7 +768,7 @@ def get_property_by_id(unique_id):
     """Get a specific property by its unique ID."""
     try:
         query = """
-        SELECT unique_id, sender_name, sender_phone, sender_phone_2, region, property_type, message, date, time
+        SELECT unique_id, sender_name, sender_phone, sender_phone_2, region, region_id, property_type, message, date, time, ts
         FROM properties 
         WHERE unique_id = ?
         """
@@ -709,6 +791,10 @@ def get_property_by_id(unique_id):
 
 # CRUD Operations
 
+def region_id_for(data):
+    """Canonical region ID of a submitted property: as given, else resolved from its region and message"""
+    return data.get('region_id') or primary_region_id(f"{data.get('region', '')} {data.get('message', '')}")
+
 @app.route('/api/property', methods=['POST'])
 def add_property():
     """Add a new property."""
@@ -723,8 +809,8 @@ def add_property():
             data['unique_id'] = f"PROP_{int(time.time())}"
         
         query = """
-        INSERT INTO properties (unique_id, sender_name, region, property_type, message, date, time)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO properties (unique_id, sender_name, region, region_id, property_type, message, date, time, ts)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         
         conn = get_db_connection()
@@ -733,10 +819,12 @@ def add_property():
             data.get('unique_id'),
             data.get('sender_name', ''),
             data.get('region', ''),
+            region_id_for(data),
             data.get('property_type', ''),
             data.get('message', ''),
             data.get('date', ''),
-            data.get('time', '')
+            data.get('time', ''),
+            message_timestamp(data.get('date', ''), data.get('time', ''))
         ))
         conn.commit()
         conn.close()
@@ -756,7 +844,7 @@ def update_property(unique_id):
         
         query = """
         UPDATE properties 
-        SET sender_name = ?, region = ?, property_type = ?, message = ?, date = ?, time = ?
+        SET sender_name = ?, region = ?, region_id = ?, property_type = ?, message = ?, date = ?, time = ?, ts = ?
         WHERE unique_id = ?
         """
         
@@ -765,10 +853,12 @@ def update_property(unique_id):
         cursor.execute(query, (
             data.get('sender_name', ''),
             data.get('region', ''),
+            region_id_for(data),
             data.get('property_type', ''),
             data.get('message', ''),
             data.get('date', ''),
             data.get('time', ''),
+            message_timestamp(data.get('date', ''), data.get('time', '')),
             unique_id
         ))
         
@@ -887,6 +977,15 @@ if __name__ == '__main__':
     db_ok, db_message = check_database()
     if db_ok:
         print(f"✅ {db_message}")
+        # The list and search endpoints filter and sort on ts and region_id
+        try:
+            backfilled = migrate_database()
+        except sqlite3.Error as e:
+            print(f"❌ Could not update the database schema: {e}")
+            print("   Rebuild it with csv_to_sqlite.py or make it writable, then start the server again")
+            raise SystemExit(1)
+        if backfilled:
+            print(f"✅ Filled ts and region_id for {backfilled:,} existing rows")
     else:
         print(f"❌ {db_message}")
         print("⚠️  Server will start but database operations may fail")
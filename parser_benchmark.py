@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Parser Benchmark Suite
+Measures simple_parser.py throughput (lines/s) and peak memory (RSS) on a
+synthetic WhatsApp export of configurable size, so changes to the parser can
+be compared on the same data at 10k to 10M lines.
+
+Three phases are run, each one in a fresh Python process so its peak RSS is
+its own:
+  - parse:  read lines and assemble messages
+  - enrich: parse + phone/keyword/region/type enrichment
+  - csv:    parse + enrich + numbering + writing the CSV
+
+Usage:
+    python parser_benchmark.py --lines 1000000 --seed 7
+    python parser_benchmark.py --data-dir whatsapp_chat_exports --json bench.json
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from synthetic_chat_generator import HEADER_STYLES, generate_exports
+
+PHASES = ['parse', 'enrich', 'csv']
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def count_lines(files):
+    total = 0
+    for filename in files:
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                total += block.count(b'\n')
+    return total
+
+def run_phase(phase, data_dir, cache_size=10000, fields=None):
+    """Run one phase in this process; returns its measurements as a dict"""
+    import simple_parser
+
+    files = sorted(glob.glob(os.path.join(data_dir, "_chat*.txt")))
+    lines = count_lines(files)
+    size = sum(os.path.getsize(filename) for filename in files)
+    baseline_rss = peak_rss_mb()
+
+    plan = simple_parser.ExtractorPlan(fields.split(',') if fields else None)
+    cache = simple_parser.EnrichmentCache(cache_size, plan) if cache_size > 0 else None
+    messages = (msg for filename in files for msg in simple_parser.iter_chat_messages(filename))
+    output_path = None
+
+    start = time.perf_counter()
+    if phase == 'parse':
+        count = sum(1 for _ in messages)
+    elif phase == 'enrich':
+        count = sum(1 for _ in simple_parser.enrich_messages(messages, cache, plan))
+    else:
+        fd, output_path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        messages = simple_parser.assign_unique_ids(simple_parser.enrich_messages(messages, cache, plan))
+        headers = simple_parser.CSV_HEADERS
+        if fields:
+            headers = [column for column in headers if column == 'unique_id' or column in fields.split(',')]
+        count = simple_parser.write_csv(messages, output_path, headers=headers)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    if output_path:
+        os.remove(output_path)
+
+    return {
+        'phase': phase,
+        'files': len(files),
+        'lines': lines,
+        'bytes': size,
+        'messages': count,
+        'seconds': round(elapsed, 4),
+        'lines_per_second': round(lines / elapsed, 1),
+        'mb_per_second': round(size / elapsed / (1024 * 1024), 3),
+        'baseline_rss_mb': baseline_rss,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def run_phase_subprocess(phase, data_dir, cache_size, fields=None):
+    """Run one phase in a child Python process and return its measurements"""
+    script = os.path.abspath(__file__)
+    command = [sys.executable, script, '--run-phase', phase, '--data-dir', data_dir, '--cache-size', str(cache_size)]
+    if fields:
+        command += ['--fields', fields]
+    output = subprocess.run(
+        command,
+        cwd=os.path.dirname(script), check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def format_mb(value):
+    return f"{value:.1f}" if value is not None else "n/a"
+
+def print_results(results):
+    print(f"\n  {'phase':<8} {'lines':>12} {'messages':>10} {'time':>9} {'lines/s':>12} {'MB/s':>7} {'peak RSS':>10}")
+    for result in results:
+        print(f"  {result['phase']:<8} {result['lines']:>12,} {result['messages']:>10,} {result['seconds']:>8.2f}s "
+              f"{result['lines_per_second']:>12,.0f} {result['mb_per_second']:>7.2f} {format_mb(result['peak_rss_mb']):>7} MB")
+    baseline = results[0]['baseline_rss_mb'] if results else None
+    print(f"  (interpreter + parser import before any phase: {format_mb(baseline)} MB)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="simple_parser.py throughput and memory benchmark")
+    parser.add_argument('--lines', type=int, default=100000,
+                        help="size of the synthetic export in lines (default: 100000)")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the synthetic export (default: 0)")
+    parser.add_argument('--files', type=int, default=1, help="number of synthetic export files (default: 1)")
+    parser.add_argument('--format', choices=HEADER_STYLES + ['mixed'], default='ios',
+                        help="header format of the synthetic export (default: ios)")
+    parser.add_argument('--data-dir', help="benchmark the _chat*.txt files in this directory instead of generating them")
+    parser.add_argument('--phases', default=','.join(PHASES),
+                        help=f"comma-separated phases to run (default: {','.join(PHASES)})")
+    parser.add_argument('--cache-size', type=int, default=10000,
+                        help="enrichment cache size, as simple_parser --cache-size (default: 10000)")
+    parser.add_argument('--fields', metavar='COLUMNS',
+                        help="only run the extractors these output columns need, as simple_parser --fields")
+    parser.add_argument('--keep', action='store_true', help="keep the generated export directory")
+    parser.add_argument('--json', metavar='PATH', help="also write the results to PATH as JSON")
+    parser.add_argument('--run-phase', choices=PHASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.phases = [phase.strip() for phase in args.phases.split(',') if phase.strip()]
+    unknown = [phase for phase in args.phases if phase not in PHASES]
+    if unknown:
+        parser.error(f"unknown phase(s): {', '.join(unknown)}")
+    return args
+
+def main():
+    args = parse_args()
+    if args.run_phase:
+        # Child process: one phase, results as a JSON line on stdout
+        print(json.dumps(run_phase(args.run_phase, args.data_dir, args.cache_size, args.fields)))
+        return
+
+    print("🏁 WhatsApp Parser Benchmark")
+    print("=" * 50)
+
+    data_dir = args.data_dir
+    generated = data_dir is None
+    if generated:
+        data_dir = tempfile.mkdtemp(prefix='chat_bench_')
+        start = time.perf_counter()
+        generate_exports(data_dir, args.lines, args.seed, args.files, args.format)
+        print(f"🧪 Generated {args.lines:,} {args.format} lines (seed {args.seed}) in {time.perf_counter() - start:.1f}s: {data_dir}")
+    else:
+        data_dir = os.path.abspath(data_dir)
+        print(f"📂 Benchmarking {data_dir}")
+
+    try:
+        results = []
+        for phase in args.phases:
+            print(f"⏳ {phase}...")
+            results.append(run_phase_subprocess(phase, data_dir, args.cache_size, args.fields))
+    finally:
+        if generated and not args.keep:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'lines': args.lines if generated else None, 'seed': args.seed if generated else None,
+                       'data_dir': None if generated else data_dir, 'results': results}, f, indent=2)
+        print(f"💾 Results saved: {args.json}")
+
+if __name__ == "__main__":
+    main()
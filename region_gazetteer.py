@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Region Gazetteer
+Resolves the places mentioned in a message to canonical region IDs
+(`obour`, `tenth_of_ramadan`, `district_19`, ...) from the aliases listed in
+region_gazetteer.txt, so the database can filter regions by equality.
+
+Text and aliases go through the same Arabic normalization and are split into
+words; the aliases are stored in a word trie and the text is scanned once,
+taking the longest alias at each word (leftmost-longest, no overlaps).
+
+Run this file directly to print the regions resolved for some text.
+"""
+
+import os
+import re
+import sys
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'region_gazetteer.txt')
+
+# Spelling variants folded before matching (str.replace beats str.translate on Arabic text)
+LETTER_VARIANTS = [('أ', 'ا'), ('إ', 'ا'), ('آ', 'ا'), ('ٱ', 'ا'), ('ة', 'ه'), ('ى', 'ي')]
+# Diacritics and tatweel, dropped from inside words
+DIACRITICS_PATTERN = re.compile('[\u064b-\u065f\u0670\u0640]')
+# Words are runs of letters or of digits: "حي18" -> "حي", "18"; "6th" -> "6", "th"
+WORD_PATTERN = re.compile(r'\d+|[^\W\d_]+')
+DIGIT_TRANSLATION = str.maketrans('٠١٢٣٤٥٦٧٨٩'
+                                  '۰۱۲۳۴۵۶۷۸۹',
+                                  '01234567890123456789')
+
+# Proclitics glued to a word: "بالحي" / "فالحي" / "والعبور" are tried as "الحي" / "العبور"
+CLITIC_PREFIXES = ('بال', 'فال', 'وال', 'كال')
+
+# Trie keys: a number word in an alias, and the region stored at the end of an alias
+NUMBER = '#'
+REGION = None
+
+def normalize_region_words(text):
+    """Normalized words of text, as matched against the gazetteer"""
+    text = text.lower()
+    for variant, letter in LETTER_VARIANTS:
+        text = text.replace(variant, letter)
+    if DIACRITICS_PATTERN.search(text):
+        text = DIACRITICS_PATTERN.sub('', text)
+    return [word if word.isascii() or not word[0].isdigit() else word.translate(DIGIT_TRANSLATION)
+            for word in WORD_PATTERN.findall(text)]
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Read a gazetteer file into a word trie
+
+    Each alias becomes a path of normalized words ending in a
+    (region_id, section) entry. Raises ValueError for malformed lines and for
+    an alias listed under two regions.
+    """
+    trie = {}
+    section = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                section = line[1:-1]
+                continue
+            region_id, sep, aliases = line.partition(':')
+            if not sep or section is None:
+                raise ValueError(f"{path}:{line_number}: expected 'region_id: alias, ...' inside a [section]")
+            region_id = region_id.strip()
+            for alias in aliases.split(','):
+                words = []
+                for part in alias.split():
+                    words += [NUMBER] if part == NUMBER else normalize_region_words(part)
+                if not words:
+                    continue
+                node = trie
+                for word in words:
+                    node = node.setdefault(word, {})
+                if REGION in node and node[REGION][0] != region_id:
+                    raise ValueError(f"{path}:{line_number}: alias {alias.strip()!r} already belongs to {node[REGION][0]}")
+                node[REGION] = (region_id, section)
+    return trie
+
+GAZETTEER = load_gazetteer()
+
+def match_region(words, start, trie=GAZETTEER):
+    """Longest alias starting at words[start]: (end, region_id, section) or None"""
+    best = None
+    first = words[start]
+    candidates = [first]
+    if first.startswith(CLITIC_PREFIXES):
+        candidates.append(first[1:])
+    for candidate in candidates:
+        node = trie
+        number = None
+        i = start
+        word = candidate
+        while True:
+            if word in node:
+                node = node[word]
+            elif NUMBER in node and word.isdigit() and len(word) <= 3:
+                node = node[NUMBER]
+                number = str(int(word))
+            else:
+                break
+            i += 1
+            entry = node.get(REGION)
+            if entry is not None and (best is None or i > best[0]):
+                region_id, section = entry
+                best = (i, region_id.replace('{n}', number) if number else region_id, section)
+            if i == len(words):
+                break
+            word = words[i]
+        if best is not None:
+            break
+    return best
+
+def resolve_regions(text, trie=GAZETTEER):
+    """Canonical regions mentioned in text, in order of first mention: [(region_id, section)]"""
+    words = normalize_region_words(text)
+    found = {}
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word not in trie and not word.startswith(CLITIC_PREFIXES):
+            i += 1
+            continue
+        match = match_region(words, i, trie)
+        if match is None:
+            i += 1
+            continue
+        i, region_id, section = match
+        found.setdefault(region_id, section)
+    return list(found.items())
+
+def primary_region_id(text, trie=GAZETTEER):
+    """The first area mentioned in text, else the first neighborhood ('' if none)"""
+    regions = resolve_regions(text, trie)
+    for region_id, section in regions:
+        if section == 'areas':
+            return region_id
+    return regions[0][0] if regions else ''
+
+def main():
+    text = ' '.join(sys.argv[1:]) or sys.stdin.read()
+    regions = resolve_regions(text)
+    for region_id, section in regions:
+        print(f"{region_id} ({section})")
+    print(f"region_id: {primary_region_id(text) or '-'}")
+
+if __name__ == "__main__":
+    main()
@@ -33,12 +33,18 @@ FROM properties
 WHERE message LIKE '%شقة%' OR message LIKE '%apartment%'
 LIMIT 50;
 
--- 6. Get properties by date range
-SELECT date, COUNT(*) as count
+-- 6. Get properties by date range (ts is ISO 8601, so the range and ordering use idx_ts)
+SELECT substr(ts, 1, 10) as day, COUNT(*) as count
 FROM properties 
-WHERE date != ''
-GROUP BY date 
-ORDER BY date DESC;
+WHERE ts >= '2025-06-01' AND ts < '2025-07-01'
+GROUP BY day 
+ORDER BY day DESC;
+
+-- 6b. Latest properties in chronological order
+SELECT unique_id, sender_name, region, property_type, ts
+FROM properties 
+ORDER BY ts DESC
+LIMIT 50;
 
 -- 7. Find properties with phone numbers
 SELECT sender_name, sender_phone, message
@@ -52,10 +58,17 @@ FROM properties
 GROUP BY file_source 
 ORDER BY count DESC;
 
+-- 8b. Properties in one region by canonical ID (equality, uses idx_region_id)
+SELECT unique_id, sender_name, region, property_type, ts
+FROM properties 
+WHERE region_id = 'obour'
+ORDER BY ts DESC
+LIMIT 50;
+
 -- 9. Advanced search with multiple criteria
 SELECT *
 FROM properties 
-WHERE region LIKE '%القاهرة%' 
+WHERE region_id = 'cairo' 
   AND property_type != ''
   AND message LIKE '%للبيع%'
 LIMIT 30;
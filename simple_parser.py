@@ -4,74 +4,228 @@ Simple WhatsApp Chat Parser
 """
 
 import os
+import sys
 import re
 import csv
 import glob
+import json
+import math
+import time
+import mmap
+import hashlib
+import shutil
+import sqlite3
+import argparse
+import itertools
+from datetime import datetime
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from database_schema import PROPERTIES_COLUMNS, create_database_schema
+from phone_extractor import extract_phone_numbers, local_phone_number
+from region_gazetteer import primary_region_id
+from stage_profiler import StageProfiler
+
+UNICODE_MARKS_PATTERN = re.compile(r'[\u200e\u200f\u202a-\u202f\xa0]')
+MULTIPLE_SPACES_PATTERN = re.compile(r' +')
 
 def clean_line(line):
     """Clean Unicode characters from line"""
-    line = re.sub(r'[\u200e\u200f\u202a-\u202f\xa0]', ' ', line.strip())
-    line = re.sub(r' +', ' ', line)
+    line = UNICODE_MARKS_PATTERN.sub(' ', line.strip())
+    line = MULTIPLE_SPACES_PATTERN.sub(' ', line)
     return line
 
+# Emoji pattern - covers most emoji ranges (compiled once, not per call)
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    "\U00002500-\U00002BEF"  # chinese char
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251"
+    "\U0001f926-\U0001f937"
+    "\U00010000-\U0010ffff"
+    "\u2640-\u2642"
+    "\u2600-\u2B55"
+    "\u200d"
+    "\u23cf"
+    "\u23e9"
+    "\u231a"
+    "\ufe0f"  # dingbats
+    "\u3030"
+    "]+", flags=re.UNICODE)
+
 def remove_emojis(text):
     """Remove all emojis from text"""
-    # Emoji pattern - covers most emoji ranges
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F1E0-\U0001F1FF"  # flags (iOS)
-        "\U00002500-\U00002BEF"  # chinese char
-        "\U00002702-\U000027B0"
-        "\U00002702-\U000027B0"
-        "\U000024C2-\U0001F251"
-        "\U0001f926-\U0001f937"
-        "\U00010000-\U0010ffff"
-        "\u2640-\u2642"
-        "\u2600-\u2B55"
-        "\u200d"
-        "\u23cf"
-        "\u23e9"
-        "\u231a"
-        "\ufe0f"  # dingbats
-        "\u3030"
-        "]+", flags=re.UNICODE)
-    return emoji_pattern.sub(r'', text)
+    return EMOJI_PATTERN.sub('', text)
+
+# Media and deleted-message boilerplate, removed in this order
+MEDIA_HEADER = r'\[\d{2}/\d{2}/\d{4}, \d{1,2}:\d{2}:\d{2} (?:AM|PM)\] '
+MEDIA_REFERENCE_PATTERNS = [re.compile(pattern, flags) for pattern, flags in [
+    # "\u200e[24/05/2025, 6:22:15 PM] ~ sender: \u200eimage omitted"
+    (rf'\u200e{MEDIA_HEADER}[^:]*: \u200e(?:image|video) omitted', 0),
+    # "\u200e[24/05/2025, 6:22:15 PM] \u202a+20 XXX XXX XXXX\u202c: \u200eimage omitted"
+    (rf'\u200e{MEDIA_HEADER}\u202a[^\u202c]*\u202c: \u200e(?:image|video) omitted', 0),
+    # The same without Unicode markers
+    (rf'{MEDIA_HEADER}[^:]*: (?:image|video) omitted', 0),
+    # Standalone media omitted text
+    (r'(?:image|video) omitted', re.IGNORECASE),
+    # "This message can't be displayed here. Please open WhatsApp on your phone to view the message."
+    (r"This message can't be displayed here\.?\s*Please open .*?WhatsApp.*? on your phone to view the message\.?", re.IGNORECASE),
+    # "This message was deleted"
+    (r'This message was deleted\.?', re.IGNORECASE),
+]]
+
+# All of the above in one pattern. The lookahead lists every possible first
+# character (\u0130/\u0131 match 'i' case-insensitively), which lets the regex
+# engine skip straight to candidate positions.
+BOILERPLATE_PATTERN = re.compile('(?=[\u200e\\[IiVvTt\u0130\u0131])(?:' + '|'.join(
+    f"(?i:{pattern.pattern})" if pattern.flags & re.IGNORECASE else pattern.pattern
+    for pattern in MEDIA_REFERENCE_PATTERNS
+) + ')')
 
 def clean_media_references(text):
-    """Remove media references like 'image omitted', 'video omitted' with timestamps"""
-    # Remove patterns like "‎[24/05/2025, 6:22:15 PM] ~ sender: ‎image omitted"
-    media_pattern1 = r'‎\[\d{2}/\d{2}/\d{4}, \d{1,2}:\d{2}:\d{2} (?:AM|PM)\] [^:]*: ‎(?:image|video) omitted'
-    text = re.sub(media_pattern1, '', text)
+    """Remove media references like 'image omitted', 'video omitted' with timestamps
     
-    # Remove patterns like "‎[24/05/2025, 6:22:15 PM] ‪+20 XXX XXX XXXX‬: ‎image omitted"
-    media_pattern2 = r'‎\[\d{2}/\d{2}/\d{4}, \d{1,2}:\d{2}:\d{2} (?:AM|PM)\] ‪[^‬]*‬: ‎(?:image|video) omitted'
-    text = re.sub(media_pattern2, '', text)
+    One scan with the combined pattern clears most messages. The rest go through
+    the patterns one by one, since removing one piece of boilerplate can join
+    the text around it into another.
+    """
+    if BOILERPLATE_PATTERN.search(text) is None:
+        return text
+    for pattern in MEDIA_REFERENCE_PATTERNS:
+        text = pattern.sub('', text)
+    return text
+
+def normalize_message(text):
+    """Cleaned message text: dots/whitespace collapsed, emojis and media boilerplate removed
     
-    # Remove patterns without Unicode markers - more general
-    media_pattern3 = r'\[\d{2}/\d{2}/\d{4}, \d{1,2}:\d{2}:\d{2} (?:AM|PM)\] [^:]*: (?:image|video) omitted'
-    text = re.sub(media_pattern3, '', text)
+    Same result as collapsing `[.\\s]+`, removing emojis, running the media
+    clean-up and collapsing `\\s+` in turn; str.split() splits on the same
+    Unicode whitespace as \\s, so each collapse is one split/join.
+    """
+    text = ' '.join(text.replace('.', ' ').split())
+    text = clean_media_references(remove_emojis(text))
+    return ' '.join(text.split())
+
+# Message header grammars, one per export format. Every pattern captures
+# (date, time, sender, message); one is picked per file by detect_header_format.
+MESSAGE_HEADER_PATTERN = re.compile(r'^\[(\d{2}/\d{2}/\d{4}), (\d{1,2}:\d{2}:\d{2} (?:AM|PM))\] ([^:]+): (.*)$')
+HEADER_PATTERNS = {
+    # iOS: [dd/mm/yyyy, h:mm:ss AM] sender: message
+    'ios': MESSAGE_HEADER_PATTERN,
+    # iOS with a 24-hour clock: [dd/mm/yyyy, hh:mm:ss] sender: message
+    'ios_24h': re.compile(r'^\[(\d{2}/\d{2}/\d{4}), (\d{1,2}:\d{2}:\d{2})\] ([^:]+): (.*)$'),
+    # Android: dd/mm/yyyy, h:mm AM - sender: message (also dd/mm/yy)
+    'android': re.compile(r'^(\d{1,2}/\d{1,2}/\d{2,4}), (\d{1,2}:\d{2} (?:AM|PM|am|pm)) - ([^:]+): (.*)$'),
+    # Android with a 24-hour clock: dd/mm/yyyy, hh:mm - sender: message
+    'android_24h': re.compile(r'^(\d{1,2}/\d{1,2}/\d{2,4}), (\d{1,2}:\d{2}) - ([^:]+): (.*)$'),
+}
+# Android system lines ("12/01/2024, 10:01 - Ahmed added +20 ...") have a header
+# but no sender; they end the current message and are dropped. Only tried on
+# lines that already looked like a header but failed the message grammar.
+SYSTEM_LINE_PATTERNS = {
+    'android': re.compile(r'^(\d{1,2}/\d{1,2}/\d{2,4}), (\d{1,2}:\d{2} (?:AM|PM|am|pm)) - (.+)$'),
+    'android_24h': re.compile(r'^(\d{1,2}/\d{1,2}/\d{2,4}), (\d{1,2}:\d{2}) - (.+)$'),
+}
+DEFAULT_HEADER_FORMAT = 'ios'
+SENDER_PHONE_PATTERN = re.compile(r'\+(\d{2} \d{3} \d{3} \d{4})')
+
+# ISO 8601 forms of the export's dd/mm/yyyy dates and h:mm:ss AM/PM times.
+# Memoized: thousands of messages share a day, and a day has at most 86,400 times.
+ISO_DATES = {}
+ISO_TIMES = {}
+
+def iso_date(date):
+    """dd/mm/yyyy (or Android's dd/mm/yy) -> yyyy-mm-dd ('' if malformed)"""
+    iso = ISO_DATES.get(date)
+    if iso is None:
+        date_format = '%d/%m/%Y' if len(date.rpartition('/')[2]) == 4 else '%d/%m/%y'
+        try:
+            iso = sys.intern(datetime.strptime(date, date_format).strftime('%Y-%m-%d'))
+        except ValueError:
+            iso = ''
+        ISO_DATES[date] = iso
+    return iso
+
+def iso_time(time):
+    """h:mm[:ss] AM/PM or hh:mm[:ss] -> hh:mm:ss in 24-hour time ('' if malformed)"""
+    iso = ISO_TIMES.get(time)
+    if iso is None:
+        # The shape of the string tells the header format it came from
+        clock, _, suffix = time.partition(' ')
+        time_format = ('%I:%M' if suffix else '%H:%M') + (':%S' if clock.count(':') == 2 else '')
+        if suffix:
+            time_format += ' %p'
+        try:
+            iso = sys.intern(datetime.strptime(time, time_format).strftime('%H:%M:%S'))
+        except ValueError:
+            iso = ''
+        ISO_TIMES[time] = iso
+    return iso
+
+def message_timestamp(date, time):
+    """Sortable ISO 8601 timestamp (yyyy-mm-ddThh:mm:ss) of an export date and time ('' if malformed)"""
+    day = iso_date(date)
+    clock = iso_time(time)
+    return f"{day}T{clock}" if day and clock else ''
+
+class Message:
+    """Compact record for one parsed message
     
-    # Remove standalone media omitted text
-    media_pattern4 = r'(?:image|video) omitted'
-    text = re.sub(media_pattern4, '', text, flags=re.IGNORECASE)
+    Fields live in __slots__ rather than a per-message dict, and repeated
+    values (dates, times, senders, keywords) are interned so messages share
+    them. Item access (msg['region'], msg.get('is_repost', '')) works as on a
+    dict, so csv.DictWriter and the SQLite loader accept a Message as a row.
+    Fields a stage never set (unique_id, is_repost, fingerprint) are missing.
+    """
     
-    # Remove "This message can't be displayed here. Please open WhatsApp on your phone to view the message."
-    whatsapp_pattern = r'This message can\'t be displayed here\.?\s*Please open .*?WhatsApp.*? on your phone to view the message\.?'
-    text = re.sub(whatsapp_pattern, '', text, flags=re.IGNORECASE)
+    __slots__ = (
+        'unique_id', 'file_source', 'date', 'time', 'ts', 'sender_name', 'sender_phone', 'sender_phone_2',
+        'message', 'message_backup', 'status', 'region', 'region_id', 'property_type', 'line_number',
+        'is_repost', 'byte_offset', 'fingerprint'
+    )
     
-    # Remove "This message was deleted" patterns
-    deleted_pattern = r'This message was deleted\.?'
-    text = re.sub(deleted_pattern, '', text, flags=re.IGNORECASE)
+    def __init__(self, date, time, sender_name, sender_phone, message):
+        self.date = sys.intern(date)
+        self.time = sys.intern(time)
+        self.ts = message_timestamp(date, time)
+        self.sender_name = sys.intern(sender_name)
+        self.sender_phone = sys.intern(sender_phone)
+        self.sender_phone_2 = ''
+        # The original text is shared until cleaning produces a new string
+        self.message = self.message_backup = message
+        self.status = ''
+        self.region = ''
+        self.region_id = ''
+        self.property_type = ''
     
-    return text
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+    
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+    
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+    
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
 
-def parse_message(line):
-    """Parse a message line"""
-    pattern = r'^\[(\d{2}/\d{2}/\d{4}), (\d{1,2}:\d{2}:\d{2} (?:AM|PM))\] ([^:]+): (.*)$'
-    match = re.match(pattern, line)
+def parse_message(line, pattern=MESSAGE_HEADER_PATTERN):
+    """Parse a message line into a Message (None if it isn't a message header)
+    
+    `pattern` is the header grammar of the line's export (iOS by default).
+    """
+    match = pattern.match(line)
     
     if match:
         date = match.group(1)
@@ -80,8 +234,7 @@ def parse_message(line):
         message = match.group(4).strip()
         
         # Extract phone
-        phone_pattern = r'\+(\d{2} \d{3} \d{3} \d{4})'
-        phone_match = re.search(phone_pattern, sender)
+        phone_match = SENDER_PHONE_PATTERN.search(sender)
         
         if phone_match:
             phone = '+' + phone_match.group(1).replace(' ', '')
@@ -90,438 +243,1626 @@ def parse_message(line):
             phone = ""
             name = sender[2:].strip() if sender.startswith('~ ') else sender.strip()
         
-        return {
-            'date': date,
-            'time': time,
-            'sender_name': name,
-            'sender_phone': phone,
-            'sender_phone_2': '',
-            'message': message,
-            'message_backup': message,
-            'status': '',
-            'region': '',
-            'property_type': ''
-        }
+        return Message(date, time, name, phone, message)
     return None
 
-def extract_status_keywords(text):
-    """Extract property status keywords from text"""
-    # Arabic keywords
-    arabic_keywords = [
-        'للبيع', 'للبيع:', 'بيع', 'بيع:', 
-        'مطلوب', 'مطلوب:', 
-        'معروض', 'معروض:', 
-        'ايجار', 'للايجار', 'للايجار:', 'ايجار:', 'للإيجار',
-        'للاستثمار', 'استثمار', 'تاجير', 'تأجير'
-    ]
-    
-    # English keywords
-    english_keywords = [
-        'for sale', 'sale', 'selling', 'sell',
-        'wanted', 'required', 'looking for',
-        'offered', 'available', 'offering',
-        'rent', 'rental', 'for rent', 'renting',
-        'lease', 'leasing', 'investment'
-    ]
-    
-    found_keywords = []
+# Property status keywords (Arabic keywords are matched as-is, English ones case-insensitively)
+STATUS_ARABIC_KEYWORDS = [
+    'للبيع', 'للبيع:', 'بيع', 'بيع:', 
+    'مطلوب', 'مطلوب:', 
+    'معروض', 'معروض:', 
+    'ايجار', 'للايجار', 'للايجار:', 'ايجار:', 'للإيجار',
+    'للاستثمار', 'استثمار', 'تاجير', 'تأجير'
+]
+
+STATUS_ENGLISH_KEYWORDS = [
+    'for sale', 'sale', 'selling', 'sell',
+    'wanted', 'required', 'looking for',
+    'offered', 'available', 'offering',
+    'rent', 'rental', 'for rent', 'renting',
+    'lease', 'leasing', 'investment'
+]
+
+# Property type keywords in Arabic and English
+PROPERTY_TYPE_KEYWORDS = {
+    'apartment': {
+        'arabic': ['شقة', 'شقه', 'الشقة', 'الشقه', 'دوبلكس', 'دوبليكس', 'بنتهاوس', 'استوديو', 'وحدة', 'وحده', 'الوحدة', 'الوحده'],
+        'english': ['apartment', 'flat', 'unit', 'duplex', 'penthouse', 'studio', 'condo', 'condominium']
+    },
+    'villa': {
+        'arabic': ['فيلا', 'فيله', 'الفيلا', 'الفيله', 'قصر', 'القصر', 'بيت', 'البيت', 'منزل', 'المنزل', 'دار', 'الدار', 'توين هاوس', 'تاون هاوس'],
+        'english': ['villa', 'house', 'mansion', 'palace', 'home', 'residence', 'townhouse', 'twin house', 'standalone']
+    },
+    'land': {
+        'arabic': ['قطعة', 'قطعه', 'ارض', 'أرض', 'الارض', 'الأرض', 'قطعة ارض', 'قطعة أرض', 'قطعه ارض', 'قطعه أرض', 'مزرعة', 'المزرعة', 'فدان'],
+        'english': ['land', 'plot', 'lot', 'piece', 'farm', 'acre', 'ground', 'site', 'parcel']
+    },
+    'commercial': {
+        'arabic': ['محل', 'المحل', 'مكتب', 'المكتب', 'عيادة', 'العيادة', 'مطعم', 'المطعم', 'مقهى', 'المقهى', 'صيدلية', 'الصيدلية', 'عمارة', 'العمارة'],
+        'english': ['shop', 'store', 'office', 'clinic', 'restaurant', 'cafe', 'pharmacy', 'building', 'commercial']
+    }
+}
+
+# Contextual clues used when no explicit property type is mentioned (matched case-sensitively)
+PROPERTY_CONTEXT_KEYWORDS = {
+    # If rooms/amenities mentioned but no clear type, likely apartment
+    'apartment': ['غرف', 'غرفة', 'حمام', 'مطبخ', 'ريسبشن', 'صالة', 'rooms', 'bedroom', 'bathroom', 'kitchen'],
+    # If area/construction mentioned without clear building type, likely land
+    'land': ['متر', 'مساحة', 'بناء', 'رخصة', 'حفر', 'meter', 'area', 'construction', 'license'],
+}
+
+# Priority ranking: More specific types first
+PROPERTY_TYPE_PRIORITY = ['villa', 'apartment', 'commercial', 'land']
+
+# Map English to Arabic property types
+PROPERTY_TYPE_ARABIC = {
+    'villa': 'فيلا',
+    'apartment': 'شقة',
+    'commercial': 'تجاري', 
+    'land': 'قطعة أرض'
+}
+
+def build_keyword_pattern(keywords):
+    """Compile keywords into one regex shaped like a trie (shared prefixes are matched once)"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def to_regex(node):
+        branches = [re.escape(char) + to_regex(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # Greedy optional: the longest keyword starting at a position wins
+            return '(?:' + body + ')?'
+        return body
+    
+    return re.compile(to_regex(trie))
+
+def build_keyword_matcher(entries):
+    """Build a multi-keyword matcher from (keyword, category) pairs
+    
+    Works like Aho-Corasick on top of the trie regex: for every keyword the
+    regex can report we precompute its output set (all keywords contained in
+    it) and the offset where the next keyword could start overlapping it, so
+    one left-to-right scan finds every keyword occurrence.
+    """
+    categories = {}
+    for keyword, category in entries:
+        categories.setdefault(keyword, [])
+        if category not in categories[keyword]:
+            categories[keyword].append(category)
+    
+    keywords = list(categories)
+    outputs = {}
+    resume = {}
+    for keyword in keywords:
+        outputs[keyword] = [other for other in keywords if other in keyword]
+        resume[keyword] = len(keyword)
+        for offset in range(1, len(keyword)):
+            tail = keyword[offset:]
+            if any(len(other) > len(tail) and other.startswith(tail) for other in keywords):
+                resume[keyword] = offset
+                break
+    
+    return {
+        'pattern': build_keyword_pattern(keywords),
+        'categories': categories,
+        'outputs': outputs,
+        'resume': resume,
+    }
+
+def _keyword_matcher_entries():
+    """Yield (keyword, category) pairs for every keyword table"""
+    for keyword in STATUS_ARABIC_KEYWORDS + STATUS_ENGLISH_KEYWORDS:
+        yield keyword, 'status'
+    for prop_type, keywords in PROPERTY_TYPE_KEYWORDS.items():
+        for keyword in keywords['arabic'] + keywords['english']:
+            yield keyword, 'type:' + prop_type
+    for prop_type, keywords in PROPERTY_CONTEXT_KEYWORDS.items():
+        for keyword in keywords:
+            yield keyword, 'context:' + prop_type
+
+KEYWORD_MATCHER = build_keyword_matcher(_keyword_matcher_entries())
+
+STATUS_KEYWORD_ORDER = {keyword: i for i, keyword in enumerate(dict.fromkeys(STATUS_ARABIC_KEYWORDS + STATUS_ENGLISH_KEYWORDS))}
+
+# Context keywords are matched case-sensitively, unlike the English keyword tables
+CASE_SENSITIVE_KEYWORDS = {keyword for keywords in PROPERTY_CONTEXT_KEYWORDS.values() for keyword in keywords}
+
+def scan_keywords(text):
+    """Find every status/property keyword in text in a single pass
+    
+    Returns a dict mapping each keyword found to its list of categories
+    ('status', 'type:<property type>' or 'context:<property type>').
+    """
+    # Arabic has no case, so scanning the lowered text covers both tables
     text_lower = text.lower()
+    search = KEYWORD_MATCHER['pattern'].search
+    outputs = KEYWORD_MATCHER['outputs']
+    resume = KEYWORD_MATCHER['resume']
+    
+    found = set()
+    match = search(text_lower)
+    while match:
+        keyword = match.group()
+        found.update(outputs[keyword])
+        match = search(text_lower, match.start() + resume[keyword])
     
-    # Search for Arabic keywords
-    for keyword in arabic_keywords:
-        if keyword in text:
-            found_keywords.append(keyword)
+    categories = KEYWORD_MATCHER['categories']
+    hits = {}
+    for keyword in found:
+        keyword_categories = categories[keyword]
+        if keyword in CASE_SENSITIVE_KEYWORDS and keyword not in text:
+            # Only found in the lowered text: keep the case-insensitive categories
+            keyword_categories = [c for c in keyword_categories if not c.startswith('context:')]
+            if not keyword_categories:
+                continue
+        hits[keyword] = keyword_categories
+    return hits
+
+def extract_status_keywords(text, hits=None):
+    """Extract property status keywords from text"""
+    if hits is None:
+        hits = scan_keywords(text)
     
-    # Search for English keywords
-    for keyword in english_keywords:
-        if keyword in text_lower:
-            found_keywords.append(keyword)
+    # Keep the keyword table order (Arabic first, then English)
+    found_keywords = sorted((keyword for keyword, categories in hits.items() if 'status' in categories),
+                            key=STATUS_KEYWORD_ORDER.get)
     
-    # Return unique keywords joined by comma
-    return ', '.join(list(dict.fromkeys(found_keywords)))  # Remove duplicates while preserving order
+    return ', '.join(found_keywords)
 
-def extract_region_names(text):
-    """Extract region/area names from message text using AI language processing"""
+# Egyptian cities and major areas
+REGION_CITIES = [
+    # Major cities
+    'القاهرة', 'cairo', 'الجيزة', 'giza', 'الإسكندرية', 'alexandria', 'أسوان', 'aswan',
+    'الأقصر', 'luxor', 'المنصورة', 'mansoura', 'طنطا', 'tanta', 'الزقازيق', 'zagazig',
+    'بورسعيد', 'port said', 'السويس', 'suez', 'الإسماعيلية', 'ismailia',
     
-    # Egyptian cities and major areas
-    egyptian_cities = [
-        # Major cities
-        'القاهرة', 'cairo', 'الجيزة', 'giza', 'الإسكندرية', 'alexandria', 'أسوان', 'aswan',
-        'الأقصر', 'luxor', 'المنصورة', 'mansoura', 'طنطا', 'tanta', 'الزقازيق', 'zagazig',
-        'بورسعيد', 'port said', 'السويس', 'suez', 'الإسماعيلية', 'ismailia',
-        
-        # New Administrative Capital and new cities
-        'العاصمة الإدارية', 'العاصمة الجديدة', 'العاصمة الادارية', 'administrative capital', 'new capital',
-        'العبور', 'el obour', 'obour', 'مدينة العبور', 'العبور الجديدة', 'new obour',
-        'بدر', 'badr', 'مدينة بدر', 'badr city', 'مدينة المستقبل', 'city of the future',
-        'الشروق', 'el shorouk', 'shorouk', 'مدينة الشروق', 'shorouk city',
-        'الرحاب', 'rehab', 'مدينة الرحاب', 'rehab city', 'التجمع', 'new cairo', 'التجمع الخامس',
-        'مدينة نصر', 'nasr city', 'المقطم', 'mokattam', 'المعادي', 'maadi',
-        
-        # 10th of Ramadan and surrounding areas
-        'العاشر من رمضان', '10th of ramadan', 'th10 of ramadan', 'العاشر', 'ramadan city',
-        '15 مايو', '15 may', 'مدينة 15 مايو', '6 أكتوبر', '6th october', 'october city',
-        
-        # Specific areas in new cities
-        'النوبارية', 'el nobariya', 'nobariya', 'وادي النطرون', 'wadi el natrun',
-        'برج العرب', 'borg el arab', 'العلمين', 'el alamein', 'alamein',
-        
-        # Districts and neighborhoods (حي)
-        'حي', 'حى', 'district', 'الحي', 'الحى'
-    ]
-    
-    # Neighborhood/district patterns (مجاورة)
-    neighborhood_patterns = [
-        'مجاورة', 'مجاوره', 'neighborhood', 'المجاورة', 'المجاوره'
-    ]
-    
-    # Compass directions and locations
-    directions = [
-        'شمال', 'north', 'جنوب', 'south', 'شرق', 'east', 'غرب', 'west',
-        'شمالي', 'شمالى', 'جنوبي', 'جنوبى', 'شرقي', 'شرقى', 'غربي', 'غربى',
-        'وسط', 'center', 'central', 'downtown'
-    ]
-    
-    # Area-specific terms
-    area_terms = [
-        'منطقة', 'area', 'المنطقة', 'نطاق', 'إقليم', 'region', 'المدينة', 'city',
-        'القرية', 'village', 'البلد', 'town', 'الضاحية', 'suburb', 'امتداد', 'extension'
-    ]
+    # New Administrative Capital and new cities
+    'العاصمة الإدارية', 'العاصمة الجديدة', 'العاصمة الادارية', 'administrative capital', 'new capital',
+    'العبور', 'el obour', 'obour', 'مدينة العبور', 'العبور الجديدة', 'new obour',
+    'بدر', 'badr', 'مدينة بدر', 'badr city', 'مدينة المستقبل', 'city of the future',
+    'الشروق', 'el shorouk', 'shorouk', 'مدينة الشروق', 'shorouk city',
+    'الرحاب', 'rehab', 'مدينة الرحاب', 'rehab city', 'التجمع', 'new cairo', 'التجمع الخامس',
+    'مدينة نصر', 'nasr city', 'المقطم', 'mokattam', 'المعادي', 'maadi',
+    
+    # 10th of Ramadan and surrounding areas
+    'العاشر من رمضان', '10th of ramadan', 'th10 of ramadan', 'العاشر', 'ramadan city',
+    '15 مايو', '15 may', 'مدينة 15 مايو', '6 أكتوبر', '6th october', 'october city',
+    
+    # Specific areas in new cities
+    'النوبارية', 'el nobariya', 'nobariya', 'وادي النطرون', 'wadi el natrun',
+    'برج العرب', 'borg el arab', 'العلمين', 'el alamein', 'alamein',
     
+    # Districts and neighborhoods (حي)
+    'حي', 'حى', 'district', 'الحي', 'الحى'
+]
+
+# Numbered neighborhoods (e.g., "حي 19", "مجاورة 3") and the label each is reported with
+NEIGHBORHOOD_PATTERNS = [
+    (re.compile(r'(?:حي|حى|الحي|الحى)\s*(\d+)', re.IGNORECASE), "حي {}"),  # حي 19, الحي 22
+    (re.compile(r'(?:مجاورة|مجاوره|المجاورة|المجاوره)\s*(\d+)', re.IGNORECASE), "مجاورة {}"),  # مجاورة 3, المجاورة 81
+    (re.compile(r'(?:district|neighborhood)\s*(\d+)', re.IGNORECASE), "District {}"),  # district 15
+    (re.compile(r'(?:المرحله|المرحلة)\s*\(?\s*(\d+)\s*\)?', re.IGNORECASE), "المرحلة {}"),  # المرحله (10)
+]
+
+# Areas with directions (e.g., "شمال المدينة", "غرب جولف")
+DIRECTION_PATTERNS = [
+    re.compile(r'(شمال|جنوب|شرق|غرب|وسط)\s+([^\s،,]{3,15})', re.IGNORECASE),  # شمال المدينة
+    re.compile(r'(north|south|east|west|central)\s+([^\s،,]{3,15})', re.IGNORECASE),  # north cairo
+    re.compile(r'امتداد\s+([^\s،,]{3,15})', re.IGNORECASE),  # امتداد غرب
+]
+
+# Potential location names after a preposition ("في X")
+LOCATION_PATTERNS = [
+    re.compile(r'(?:في|ف|بـ|ب)\s+([أ-ي\w]{3,20})', re.IGNORECASE),  # في بدر, ف الشروق
+    re.compile(r'(?:in|at)\s+([a-zA-Z]{3,20})', re.IGNORECASE),  # in Badr, at Shorouk
+]
+
+# Common words after a preposition that aren't locations
+LOCATION_STOPWORDS = {
+    'الحي', 'حي', 'مجاورة', 'مجاوره', 'المجاورة', 'المجاوره',
+    'البيت', 'الشقة', 'العقار', 'المنزل', 'الفيلا', 'house', 'apartment',
+    'property', 'villa', 'building', 'floor', 'room', 'meter', 'متر',
+    'ادوار', 'دور', 'غرفة', 'صالة', 'مطبخ', 'حمام'
+}
+
+# At most this many regions are kept per message (to avoid noise)
+MAX_REGIONS = 3
+
+def direction_region(match):
+    """Region label for a DIRECTION_PATTERNS match (a string or a group tuple)"""
+    if isinstance(match, tuple):
+        return ' '.join(match)
+    return f"امتداد {match}"
+
+def join_regions(found_regions):
+    """Strip, drop too-short names, deduplicate in order and keep the first MAX_REGIONS"""
+    cleaned_regions = [region.strip() for region in found_regions]
+    unique_regions = list(dict.fromkeys(region for region in cleaned_regions if len(region) >= 2))
+    return ', '.join(unique_regions[:MAX_REGIONS])
+
+def extract_region_names(text):
+    """Extract region/area names from message text using AI language processing"""
     found_regions = []
     text_lower = text.lower()
     
     # Extract Egyptian cities and areas
-    for city in egyptian_cities:
+    for city in REGION_CITIES:
         if city.lower() in text_lower:
             found_regions.append(city)
     
-    # Extract neighborhood patterns with numbers (e.g., "حي 19", "مجاورة 3")
-    neighborhood_patterns_regex = [
-        r'(?:حي|حى|الحي|الحى)\s*(\d+)',  # حي 19, الحي 22
-        r'(?:مجاورة|مجاوره|المجاورة|المجاوره)\s*(\d+)',  # مجاورة 3, المجاورة 81
-        r'(?:district|neighborhood)\s*(\d+)',  # district 15
-        r'(?:المرحله|المرحلة)\s*\(?\s*(\d+)\s*\)?',  # المرحله (10)
-    ]
-    
-    for pattern in neighborhood_patterns_regex:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if 'حي' in pattern or 'حى' in pattern:
-                found_regions.append(f"حي {match}")
-            elif 'مجاور' in pattern:
-                found_regions.append(f"مجاورة {match}")
-            elif 'district' in pattern:
-                found_regions.append(f"District {match}")
-            elif 'المرحل' in pattern:
-                found_regions.append(f"المرحلة {match}")
-    
-    # Extract areas with directions (e.g., "شمال المدينة", "غرب جولف")
-    direction_patterns = [
-        r'(شمال|جنوب|شرق|غرب|وسط)\s+([^\s،,]{3,15})',  # شمال المدينة
-        r'(north|south|east|west|central)\s+([^\s،,]{3,15})',  # north cairo
-        r'امتداد\s+([^\s،,]{3,15})',  # امتداد غرب
-    ]
-    
-    for pattern in direction_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if isinstance(match, tuple):
-                if len(match) == 2:
-                    found_regions.append(f"{match[0]} {match[1]}")
-                else:
-                    found_regions.append(' '.join(match))
-            else:
-                found_regions.append(f"امتداد {match}")
+    # Extract neighborhood patterns with numbers
+    for pattern, label in NEIGHBORHOOD_PATTERNS:
+        for match in pattern.findall(text):
+            found_regions.append(label.format(match))
+    
+    # Extract areas with directions
+    for pattern in DIRECTION_PATTERNS:
+        for match in pattern.findall(text):
+            found_regions.append(direction_region(match))
     
     # Extract specific location names (potential areas/landmarks)
-    # Look for patterns like "في X" where X could be a location
-    location_patterns = [
-        r'(?:في|ف|بـ|ب)\s+([أ-ي\w]{3,20})',  # في بدر, ف الشروق
-        r'(?:in|at)\s+([a-zA-Z]{3,20})',  # in Badr, at Shorouk
-    ]
-    
-    for pattern in location_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            # Filter out common words that aren't locations
-            if match.lower() not in ['الحي', 'حي', 'مجاورة', 'مجاوره', 'المجاورة', 'المجاوره', 
-                                   'البيت', 'الشقة', 'العقار', 'المنزل', 'الفيلا', 'house', 'apartment',
-                                   'property', 'villa', 'building', 'floor', 'room', 'meter', 'متر',
-                                   'ادوار', 'دور', 'غرفة', 'صالة', 'مطبخ', 'حمام']:
-                if len(match) >= 3:  # Only include meaningful location names
-                    found_regions.append(match)
-    
-    # Clean and deduplicate regions
-    cleaned_regions = []
-    for region in found_regions:
-        region = region.strip()
-        if region and len(region) >= 2:
-            cleaned_regions.append(region)
-    
-    # Remove duplicates while preserving order
-    unique_regions = list(dict.fromkeys(cleaned_regions))
-    
-    # Limit to most relevant regions (max 3 to avoid noise)
-    return ', '.join(unique_regions[:3]) if unique_regions else ''
-
-def extract_property_type(text):
-    """Extract property type from message text using AI language processing"""
+    for pattern in LOCATION_PATTERNS:
+        for match in pattern.findall(text):
+            if match.lower() not in LOCATION_STOPWORDS and len(match) >= 3:
+                found_regions.append(match)
     
-    # Define property type keywords in Arabic and English
-    property_types = {
-        'apartment': {
-            'arabic': ['شقة', 'شقه', 'الشقة', 'الشقه', 'دوبلكس', 'دوبليكس', 'بنتهاوس', 'استوديو', 'وحدة', 'وحده', 'الوحدة', 'الوحده'],
-            'english': ['apartment', 'flat', 'unit', 'duplex', 'penthouse', 'studio', 'condo', 'condominium']
-        },
-        'villa': {
-            'arabic': ['فيلا', 'فيله', 'الفيلا', 'الفيله', 'قصر', 'القصر', 'بيت', 'البيت', 'منزل', 'المنزل', 'دار', 'الدار', 'توين هاوس', 'تاون هاوس'],
-            'english': ['villa', 'house', 'mansion', 'palace', 'home', 'residence', 'townhouse', 'twin house', 'standalone']
-        },
-        'land': {
-            'arabic': ['قطعة', 'قطعه', 'ارض', 'أرض', 'الارض', 'الأرض', 'قطعة ارض', 'قطعة أرض', 'قطعه ارض', 'قطعه أرض', 'مزرعة', 'المزرعة', 'فدان'],
-            'english': ['land', 'plot', 'lot', 'piece', 'farm', 'acre', 'ground', 'site', 'parcel']
-        },
-        'commercial': {
-            'arabic': ['محل', 'المحل', 'مكتب', 'المكتب', 'عيادة', 'العيادة', 'مطعم', 'المطعم', 'مقهى', 'المقهى', 'صيدلية', 'الصيدلية', 'عمارة', 'العمارة'],
-            'english': ['shop', 'store', 'office', 'clinic', 'restaurant', 'cafe', 'pharmacy', 'building', 'commercial']
-        }
-    }
+    return join_regions(found_regions)
+
+def extract_property_type(text, hits=None):
+    """Extract property type from message text using AI language processing"""
+    if hits is None:
+        hits = scan_keywords(text)
     
-    text_lower = text.lower()
-    detected_types = []
-    
-    # Check for each property type
-    for prop_type, keywords in property_types.items():
-        # Check Arabic keywords
-        for keyword in keywords['arabic']:
-            if keyword in text:
-                detected_types.append(prop_type)
-                break
-        
-        # Check English keywords if not already detected
-        if prop_type not in detected_types:
-            for keyword in keywords['english']:
-                if keyword in text_lower:
-                    detected_types.append(prop_type)
-                    break
+    detected_types = set()
+    context_types = set()
+    for keyword_categories in hits.values():
+        for category in keyword_categories:
+            if category.startswith('type:'):
+                detected_types.add(category[5:])
+            elif category.startswith('context:'):
+                context_types.add(category[8:])
     
     # Context-based classification for ambiguous cases
     if not detected_types:
-        # Look for contextual clues
-        if any(word in text for word in ['غرف', 'غرفة', 'حمام', 'مطبخ', 'ريسبشن', 'صالة', 'rooms', 'bedroom', 'bathroom', 'kitchen']):
-            # If rooms/amenities mentioned but no clear type, likely apartment
-            detected_types.append('apartment')
-        elif any(word in text for word in ['متر', 'مساحة', 'بناء', 'رخصة', 'حفر', 'meter', 'area', 'construction', 'license']):
-            # If area/construction mentioned without clear building type, likely land
-            detected_types.append('land')
-    
-    # Priority ranking: More specific types first
-    priority_order = ['villa', 'apartment', 'commercial', 'land']
-    
-    # Map English to Arabic property types
-    arabic_types = {
-        'villa': 'فيلا',
-        'apartment': 'شقة',
-        'commercial': 'تجاري', 
-        'land': 'قطعة أرض'
-    }
+        # Rooms/amenities point to an apartment before area/construction points to land
+        for prop_type in PROPERTY_CONTEXT_KEYWORDS:
+            if prop_type in context_types:
+                detected_types.add(prop_type)
+                break
     
-    for prop_type in priority_order:
+    for prop_type in PROPERTY_TYPE_PRIORITY:
         if prop_type in detected_types:
-            return arabic_types[prop_type]
+            return PROPERTY_TYPE_ARABIC[prop_type]
     
     # Return empty if no type detected
     return ''
 
-def main():
-    print("🔍 WhatsApp Chat Parser - Simple Version")
-    print("=" * 50)
+CSV_HEADERS = ['unique_id', 'file_source', 'date', 'time', 'ts', 'sender_name', 'sender_phone', 'sender_phone_2', 'message', 'message_backup', 'status', 'region', 'region_id', 'property_type', 'line_number']
+
+# Manifest used by --incremental to remember how far each export has been parsed
+MANIFEST_PATH = 'whatsapp_chats.manifest.json'
+MANIFEST_VERSION = 3
+
+def content_message_id(file_source, line_number, date, time, sender):
+    """Stable ID derived from the file, the line a message starts on and its header
     
-    # Find chat files
-    files = glob.glob("whatsapp_chat_exports/_chat*.txt")
-    print(f"Found {len(files)} chat files")
+    The header's date, time and sender make the ID content-derived, so a
+    different message that later lands on the same line gets a new ID.
+    """
+    digest = hashlib.sha1(f"{file_source}\n{line_number}\n{date}\n{time}\n{sender}".encode('utf-8')).hexdigest()
+    return f"PRO-{digest[:16]}"
+
+def header_sender(msg):
+    """The sender as given in the message header, whichever extractors ran
     
-    all_messages = []
+    A header phone is kept as parsed ('+20...'; numbers filled in from the
+    text start with 0); a name is cleaned as clean_sender_name does, which
+    leaves an already cleaned name unchanged.
+    """
+    if msg.sender_phone.startswith('+'):
+        return msg.sender_phone
+    return ' '.join(remove_emojis(msg.sender_name).split())
+
+# UTF-8 encodings of the non-ASCII characters str.strip() treats as whitespace;
+# a line starting with one of them must go through the full header check
+UNICODE_SPACE_PREFIXES = tuple(chr(c).encode('utf-8') for c in range(0x80, 0x3001) if chr(c).isspace())
+ASCII_SPACE_BYTES = b' \t\n\r\x0b\x0c'
+DIGIT_BYTES = b'0123456789'
+
+# Bytes clean_line() strips or blanks before a header could start
+SPACE_FIRST_BYTES = set(ASCII_SPACE_BYTES) | set(b'\x1c\x1d\x1e\x1f') | {prefix[0] for prefix in UNICODE_SPACE_PREFIXES}
+
+class HeaderFormat:
+    """The header grammar of one export format plus its bytes-level pre-check
     
-    for filename in files:
-        print(f"Processing: {filename}")
-        count = 0
-        current_msg = None
+    `never_header` maps a line's first byte to 1 when the line can't be a
+    header in this format: anything but spaces and '[' for the bracketed iOS
+    headers, anything but spaces and digits (ASCII or Unicode) for Android's.
+    `system_pattern` matches the format's sender-less system lines (None if
+    the format has none).
+    """
+    
+    def __init__(self, name, pattern, system_pattern=None):
+        self.name = name
+        self.pattern = pattern
+        self.system_pattern = system_pattern
+        self.bracketed = pattern.pattern.startswith('^\\[')
+        if self.bracketed:
+            first_bytes = SPACE_FIRST_BYTES | set(b'[')
+        else:
+            first_bytes = SPACE_FIRST_BYTES | set(DIGIT_BYTES) | set(range(0x80, 0x100))
+        self.never_header = bytes(0 if byte in first_bytes else 1 for byte in range(256))
+
+HEADER_FORMATS = {name: HeaderFormat(name, pattern, SYSTEM_LINE_PATTERNS.get(name))
+                  for name, pattern in HEADER_PATTERNS.items()}
+
+# Lines sampled from the top of a file to pick its header format
+FORMAT_SAMPLE_LINES = 200
+
+def detect_header_format(filename, sample_lines=FORMAT_SAMPLE_LINES):
+    """Pick the HeaderFormat whose grammar matches most of a file's first lines
+    
+    The whole file is then parsed with that single precompiled pattern; ties
+    and files without any recognizable header fall back to iOS.
+    """
+    counts = dict.fromkeys(HEADER_FORMATS, 0)
+    with open(filename, 'r', encoding='utf-8', errors='replace') as f:
+        for line_num, line in enumerate(f):
+            if line_num >= sample_lines:
+                break
+            cleaned = clean_line(line)
+            if not cleaned:
+                continue
+            for name, header_format in HEADER_FORMATS.items():
+                if header_format.pattern.match(cleaned):
+                    counts[name] += 1
+    best = max(counts, key=counts.get)
+    return HEADER_FORMATS[best if counts[best] else DEFAULT_HEADER_FORMAT]
+
+def read_chat_lines(filename, start=0, end=None, first_line=1):
+    """Yield (line_number, raw_line, byte_offset) for every non-blank line of a chat export
+    
+    The file is memory-mapped and split on b'\n' without decoding; lines are
+    returned as bytes so callers only decode what they keep. Reading can start
+    at a byte offset (with its line number) and stop at `end`, which is how
+    --incremental parses only the appended part of an export.
+    """
+    with open(filename, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if end is None or end > size:
+            end = size
+        if start >= end:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            find = mm.find
+            pos = start
+            line_num = first_line
+            while pos < end:
+                newline = find(b'\n', pos)
+                stop = size if newline < 0 else newline + 1
+                raw = mm[pos:stop]
+                if raw.strip():
+                    yield line_num, raw, pos
+                pos = stop
+                line_num += 1
+
+def could_be_header(raw, bracketed=True):
+    """Cheap bytes-level check: False means the line can never be a message header
+    
+    clean_line() strips the line before parse_message() requires it to start
+    with '[' and a digit (iOS) or with a digit (Android), so only lines whose
+    first non-space byte fits (or that start with Unicode whitespace) need the
+    full regex.
+    """
+    stripped = raw.lstrip(ASCII_SPACE_BYTES)
+    first = stripped[:1]
+    if not first:
+        return False
+    # Non-ASCII may still be a Unicode digit, which \d accepts
+    if bracketed:
+        if first == b'[':
+            second = stripped[1:2]
+            return second != b'' and (second in DIGIT_BYTES or second >= b'\x80')
+    elif first in DIGIT_BYTES:
+        # Android dates start with one or two digits and a '/'
+        return b'/' in stripped[1:3] or stripped[1:2] >= b'\x80'
+    elif first >= b'\x80' and stripped[:4].decode('utf-8', 'ignore')[:1].isdecimal():
+        return True
+    return first in b'\x1c\x1d\x1e\x1f' or stripped.startswith(UNICODE_SPACE_PREFIXES)
+
+def assemble_messages(lines, filename, header_format=None):
+    """Group header lines and their continuation lines into raw Messages
+    
+    Lines arrive as bytes; continuation lines before the first header are
+    dropped without being decoded. A message's lines are collected and joined
+    once, and message/message_backup share that string until enrichment
+    changes one. Headers are recognized with the single grammar of
+    `header_format` (iOS by default); a system line of that format ends the
+    current message and is dropped, along with any lines that follow it.
+    """
+    current_msg = None
+    parts = None
+    
+    if header_format is None:
+        header_format = HEADER_FORMATS[DEFAULT_HEADER_FORMAT]
+    never_header = header_format.never_header
+    bracketed = header_format.bracketed
+    pattern = header_format.pattern
+    system_pattern = header_format.system_pattern
+    for line_num, raw, offset in lines:
+        parsed = None
+        if not never_header[raw[0]] and could_be_header(raw, bracketed):
+            line = raw.decode('utf-8')
+            if not line.strip():
+                continue
+            cleaned = clean_line(line)
+            parsed = parse_message(cleaned, pattern)
+            if parsed is None and system_pattern is not None and system_pattern.match(cleaned):
+                if current_msg:
+                    if len(parts) > 1:
+                        current_msg.message = current_msg.message_backup = ' '.join(parts)
+                    yield current_msg
+                current_msg = None
+                continue
+        elif current_msg:
+            line = raw.decode('utf-8')
+        else:
+            continue
         
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    if not line.strip():
+        if parsed:
+            if current_msg:
+                if len(parts) > 1:
+                    current_msg.message = current_msg.message_backup = ' '.join(parts)
+                yield current_msg
+            current_msg = parsed
+            current_msg.file_source = filename
+            current_msg.line_number = line_num
+            current_msg.byte_offset = offset
+            parts = [parsed.message]
+        elif current_msg:
+            text = line.strip()
+            if text:
+                parts.append(text)
+    
+    if current_msg:
+        if len(parts) > 1:
+            current_msg.message = current_msg.message_backup = ' '.join(parts)
+        yield current_msg
+
+def iter_chat_messages(filename, start=0, end=None, first_line=1):
+    """Yield raw messages from one chat export (or the part of it after `start`)
+    
+    The header format is detected from the top of the file, so an appended
+    part is parsed with the same grammar as the rest of the export.
+    """
+    header_format = detect_header_format(filename)
+    return assemble_messages(read_chat_lines(filename, start, end, first_line), filename, header_format)
+
+# Enrichment extractors: name -> (dependencies, function). Text extractors
+# see only the original message text and the results of their dependencies
+# (`found`), so their results can be cached per text; message extractors then
+# update the record. Each looks its helpers up at call time, so --profile can
+# still wrap them in place.
+TEXT_EXTRACTORS = {
+    # (phone numbers, message with them stripped), found in one scan
+    'phones': ((), lambda text, found: extract_phone_numbers(text)),
+    # Collapse spaces and dots, remove emojis and media references
+    'message': (('phones',), lambda text, found: normalize_message(found['phones'][1])),
+    # One keyword scan shared by status and property type
+    'keyword_hits': ((), lambda text, found: scan_keywords(text)),
+    'status': (('keyword_hits',), lambda text, found: sys.intern(extract_status_keywords(text, found['keyword_hits']))),
+    'region': ((), lambda text, found: sys.intern(extract_region_names(text))),
+    # Canonical gazetteer ID of the main region, for equality filters
+    'region_id': ((), lambda text, found: sys.intern(primary_region_id(text))),
+    'property_type': (('keyword_hits',), lambda text, found: sys.intern(extract_property_type(text, found['keyword_hits']))),
+}
+
+def fill_sender_phone(msg, found):
+    """If sender_phone is empty, use the first full 11-digit mobile number"""
+    numbers = found['phones'][0]
+    if numbers and not msg.sender_phone:
+        msg.sender_phone = sys.intern(next((number for number in numbers if len(number) == 11), ''))
+
+def fill_sender_phone_2(msg, found):
+    """The second phone is the first number that isn't the sender's own"""
+    numbers = found['phones'][0]
+    if numbers:
+        own_number = local_phone_number(msg.sender_phone)
+        msg.sender_phone_2 = sys.intern(next((number for number in numbers if number != own_number), ''))
+
+def clean_sender_name(msg, found):
+    """Clean sender_name from emojis and extra spaces"""
+    msg.sender_name = sys.intern(' '.join(remove_emojis(msg.sender_name).split()))
+
+MESSAGE_EXTRACTORS = {
+    'sender_phone': (('phones',), fill_sender_phone),
+    # Needs the filled-in sender_phone to recognise the sender's own number
+    'sender_phone_2': (('phones', 'sender_phone'), fill_sender_phone_2),
+    'sender_name': ((), clean_sender_name),
+}
+
+# Output columns produced by an extractor of the same name; every other column
+# comes straight from the parsed header and line
+ENRICHED_COLUMNS = ['sender_name', 'sender_phone', 'sender_phone_2', 'message', 'status', 'region', 'region_id', 'property_type']
+
+class ExtractorPlan:
+    """The extractors needed for a set of output columns, dependencies first
+    
+    `fields` are output column names (None for all of them); extractors no
+    requested column depends on never run.
+    """
+    
+    def __init__(self, fields=None):
+        self.fields = list(fields) if fields is not None else None
+        wanted = ENRICHED_COLUMNS if fields is None else [field for field in ENRICHED_COLUMNS if field in fields]
+        order = []
+        
+        def visit(name):
+            if name in order:
+                return
+            dependencies = (TEXT_EXTRACTORS.get(name) or MESSAGE_EXTRACTORS[name])[0]
+            for dependency in dependencies:
+                visit(dependency)
+            order.append(name)
+        
+        for name in wanted:
+            visit(name)
+        self.text_steps = [name for name in order if name in TEXT_EXTRACTORS]
+        self.message_steps = [name for name in order if name in MESSAGE_EXTRACTORS]
+        # Text results copied onto the message record
+        self.text_columns = [name for name in self.text_steps if name in ENRICHED_COLUMNS]
+        # Intermediate text results no message extractor reads (not worth caching)
+        needed = {dependency for name in self.message_steps for dependency in MESSAGE_EXTRACTORS[name][0]}
+        self.transient = [name for name in self.text_steps if name not in ENRICHED_COLUMNS and name not in needed]
+        self.text_functions = [(name, TEXT_EXTRACTORS[name][1]) for name in self.text_steps]
+        self.message_functions = [MESSAGE_EXTRACTORS[name][1] for name in self.message_steps]
+    
+    def extractors(self):
+        return self.text_steps + self.message_steps
+
+ALL_EXTRACTORS = ExtractorPlan()
+
+def enrich_text(text, plan=ALL_EXTRACTORS):
+    """Run the plan's text extractors on a message's original text
+    
+    Returns {extractor name: result}, e.g. 'phones' is (numbers, stripped text)
+    and 'message', 'status', 'region', 'region_id' and 'property_type' the cleaned fields;
+    intermediate results only other text extractors need are dropped.
+    """
+    found = {}
+    for name, extract in plan.text_functions:
+        found[name] = extract(text, found)
+    for name in plan.transient:
+        del found[name]
+    return found
+
+class EnrichmentCache:
+    """Bounded LRU cache of enrich_text results, keyed by a hash of the text
+    
+    Copy-pasted ads then cost one dictionary lookup instead of the full set of
+    cleaning and keyword passes. `hits` and `misses` count lookups. Entries
+    hold the results of one extractor plan, so a cache serves a single plan.
+    """
+    
+    def __init__(self, max_size, plan=ALL_EXTRACTORS):
+        self.max_size = max_size
+        self.plan = plan
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def enrich_text(self, text):
+        """enrich_text(text, plan), answered from the cache when the text was seen recently"""
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        result = self.entries.get(key)
+        if result is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return result
+        
+        self.misses += 1
+        result = enrich_text(text, self.plan)
+        self.entries[key] = result
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return result
+
+def enrich_message(msg, cache=None, plan=ALL_EXTRACTORS):
+    """Run the plan's extractors (by default phones, keywords, region and property type) on one message"""
+    if cache is not None:
+        # The cache runs its own plan, which is the same one
+        found = cache.enrich_text(msg.message_backup)
+    else:
+        found = enrich_text(msg.message_backup, plan)
+    for name in plan.text_columns:
+        setattr(msg, name, found[name])
+    for extract in plan.message_functions:
+        extract(msg, found)
+    return msg
+
+def enrich_messages(messages, cache=None, plan=None):
+    """Enrichment stage: yield each message after extracting its derived fields
+    
+    `plan` defaults to the cache's plan, or to every extractor without a cache.
+    """
+    if plan is None:
+        plan = cache.plan if cache is not None else ALL_EXTRACTORS
+    for msg in messages:
+        yield enrich_message(msg, cache, plan)
+
+# Enrichment cache and extractor plan of a worker process, set up by init_worker
+worker_cache = None
+worker_plan = ALL_EXTRACTORS
+
+def init_worker(cache_size, fields=None):
+    """Give each worker process its own extractor plan and enrichment cache for all the files it parses"""
+    global worker_cache, worker_plan
+    worker_plan = ExtractorPlan(fields)
+    worker_cache = EnrichmentCache(cache_size, worker_plan) if cache_size > 0 else None
+
+def process_chat_file(plan):
+    """Parse and enrich one chat file (runs inside a worker process)
+    
+    Returns (filename, messages, error, cache_hits, cache_misses), the cache
+    counters covering this file only.
+    """
+    filename, start, end, first_line = plan
+    messages = []
+    error = None
+    hits = worker_cache.hits if worker_cache else 0
+    misses = worker_cache.misses if worker_cache else 0
+    try:
+        for msg in enrich_messages(with_fingerprints(iter_chat_messages(filename, start, end, first_line)), worker_cache, worker_plan):
+            messages.append(msg)
+    except Exception as e:
+        error = str(e)
+    
+    if worker_cache:
+        hits = worker_cache.hits - hits
+        misses = worker_cache.misses - misses
+    return filename, messages, error, hits, misses
+
+def parse_chat_range(plan):
+    """Parse one chat file or range without enriching it (runs inside a worker process)
+    
+    Returns (filename, messages, error), the messages carrying their repost
+    fingerprints so the parent can filter them before paying for enrichment.
+    """
+    filename, start, end, first_line = plan
+    messages = []
+    error = None
+    try:
+        for msg in with_fingerprints(iter_chat_messages(filename, start, end, first_line)):
+            messages.append(msg)
+    except Exception as e:
+        error = str(e)
+    return filename, messages, error
+
+def enrich_chunk(messages):
+    """Enrich messages returned by parse_chat_range (runs inside a worker process)
+    
+    Returns (messages, cache_hits, cache_misses), the cache counters covering
+    these messages only.
+    """
+    hits = worker_cache.hits if worker_cache else 0
+    misses = worker_cache.misses if worker_cache else 0
+    messages = list(enrich_messages(messages, worker_cache, worker_plan))
+    if worker_cache:
+        hits = worker_cache.hits - hits
+        misses = worker_cache.misses - misses
+    return messages, hits, misses
+
+def filter_then_enrich(executor, chunks, raw_filter):
+    """Worker results with `raw_filter` applied before enrichment
+    
+    Workers parse every chunk, the filter runs here in file order (it keeps
+    state across files), and only the messages it lets through are sent back
+    to the pool to be enriched. Yields the same (filename, messages, error,
+    cache_hits, cache_misses) tuples as process_chat_file, in chunk order.
+    """
+    pending = deque()
+    failed_files = set()
+    for filename, messages, error in executor.map(parse_chat_range, chunks):
+        # As in a serial run, nothing after a file's first error reaches the filter
+        messages = [] if filename in failed_files else list(raw_filter(messages))
+        if error:
+            failed_files.add(filename)
+        pending.append((filename, executor.submit(enrich_chunk, messages), error))
+        while pending and pending[0][1].done():
+            yield enriched_result(*pending.popleft())
+    while pending:
+        yield enriched_result(*pending.popleft())
+
+def enriched_result(filename, future, error):
+    """process_chat_file-shaped result for a chunk enriched by enrich_chunk"""
+    messages, hits, misses = future.result()
+    return filename, messages, error, hits, misses
+
+def full_parse_plan(filename):
+    """Plan entry that parses a whole file: (filename, start, end, first_line)"""
+    return filename, 0, None, 1
+
+def starts_message(raw, header_format):
+    """True if the raw line is a message header in header_format"""
+    if header_format.never_header[raw[0]] or not could_be_header(raw, header_format.bracketed):
+        return False
+    return header_format.pattern.match(clean_line(raw.decode('utf-8'))) is not None
+
+def next_header_offset(mm, pos, end, header_format):
+    """Byte offset of the first message header starting at or after pos (end if none)"""
+    newline = mm.find(b'\n', pos - 1, end)
+    while newline >= 0:
+        line_start = newline + 1
+        newline = mm.find(b'\n', line_start, end)
+        raw = mm[line_start:newline + 1 if newline >= 0 else end]
+        if raw.strip() and starts_message(raw, header_format):
+            return line_start
+    return end
+
+def split_plan(plan, chunk_size):
+    """Split a plan entry into ranges of about chunk_size bytes for parallel parsing
+    
+    Every range but the first starts at a message header, so a multi-line
+    message is never cut in two, and carries the line number of its first
+    line (the newlines before it are counted), so line_number and content
+    IDs come out as in a serial run. Small files stay one range.
+    """
+    filename, start, end, first_line = plan
+    size = os.path.getsize(filename)
+    if end is None or end > size:
+        end = size
+    if chunk_size <= 0 or end - start <= chunk_size:
+        return [plan]
+    
+    header_format = detect_header_format(filename)
+    ranges = []
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        range_start, range_line = start, first_line
+        while range_start + chunk_size < end:
+            boundary = next_header_offset(mm, range_start + chunk_size, end, header_format)
+            if boundary >= end:
+                break
+            ranges.append((filename, range_start, boundary, range_line))
+            range_line += mm[range_start:boundary].count(b'\n')
+            range_start = boundary
+    ranges.append((filename, range_start, end, range_line))
+    return ranges
+
+def stream_messages(plans, workers=1, failed=None, raw_filter=None, cache=None, chunk_size=0, plan=None):
+    """Yield enriched messages from every planned file, always in file order
+    
+    Serially, messages flow one at a time from the file to the caller. With
+    workers, each file (or, for files over `chunk_size` bytes, each
+    message-aligned range of it) is parsed in its own process and handed back
+    whole. Files that raise an error are reported and added to `failed` if given.
+    `raw_filter` is a generator stage applied to messages before enrichment;
+    with workers it runs in this process between the parse and enrich steps,
+    since it needs state shared across files.
+    `cache` is the EnrichmentCache used for enrichment; each worker process
+    keeps one of the same size and its hit/miss counts are added to `cache`.
+    `plan` is the ExtractorPlan to run (every extractor by default).
+    """
+    if raw_filter is None:
+        raw_filter = iter
+    
+    chunks = [chunk for plan in plans for chunk in split_plan(plan, chunk_size)] if workers > 1 else plans
+    if workers > 1 and len(chunks) > 1:
+        cache_size = cache.max_size if cache is not None else 0
+        fields = plan.fields if plan is not None else None
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cache_size, fields)) as executor:
+            # executor.map keeps results in submission order, so a file's ranges arrive in a row
+            ranges = {}
+            for chunk in chunks:
+                ranges[chunk[0]] = ranges.get(chunk[0], 0) + 1
+            if raw_filter is iter:
+                results = executor.map(process_chat_file, chunks)
+            else:
+                results = filter_then_enrich(executor, chunks, raw_filter)
+            for filename, file_results in itertools.groupby(results, key=lambda result: result[0]):
+                print(f"Processing: {filename}" + (f" ({ranges[filename]} ranges)" if ranges[filename] > 1 else ""))
+                count = 0
+                error = None
+                for _, messages, chunk_error, hits, misses in file_results:
+                    if cache is not None:
+                        cache.hits += hits
+                        cache.misses += misses
+                    if error:
+                        # As in a serial run, nothing after the first error is kept
                         continue
-                    
-                    cleaned = clean_line(line)
-                    parsed = parse_message(cleaned)
-                    
-                    if parsed:
-                        if current_msg:
-                            all_messages.append(current_msg)
-                        current_msg = parsed
-                        current_msg['file_source'] = filename
-                        current_msg['line_number'] = line_num
-                        count += 1
-                    else:
-                        if current_msg:
-                            current_msg['message'] += ' ' + line.strip()
-                            current_msg['message_backup'] += ' ' + line.strip()
-                
-                if current_msg:
-                    all_messages.append(current_msg)
-                    
-            print(f"  - Extracted {count} messages")
-            
+                    yield from messages
+                    count += len(messages)
+                    error = chunk_error
+                if error:
+                    print(f"  - Error: {error}")
+                    if failed is not None:
+                        failed.add(filename)
+                else:
+                    print(f"  - Extracted {count} messages")
+        return
+    
+    for filename, start, end, first_line in plans:
+        print(f"Processing: {filename}" + (f" (from byte {start:,})" if start else ""))
+        count = 0
+        try:
+            for msg in enrich_messages(raw_filter(iter_chat_messages(filename, start, end, first_line)), cache, plan):
+                count += 1
+                yield msg
         except Exception as e:
             print(f"  - Error: {e}")
+            if failed is not None:
+                failed.add(filename)
+            continue
+        print(f"  - Extracted {count} messages")
+
+def skip_duplicate_exports(files):
+    """Drop exports that are byte-identical to an earlier file in the list
+    
+    Only files that share their size with another file are hashed.
+    """
+    sizes = {}
+    for filename in files:
+        sizes.setdefault(os.path.getsize(filename), []).append(filename)
+    
+    first_by_hash = {}
+    unique_files = []
+    for filename in files:
+        size = os.path.getsize(filename)
+        if len(sizes[size]) > 1:
+            digest = hash_file_prefix(filename, size)
+            if digest in first_by_hash:
+                print(f"Skipping duplicate export: {filename} (identical to {first_by_hash[digest]})")
+                continue
+            first_by_hash[digest] = filename
+        unique_files.append(filename)
+    return unique_files
+
+# Messages shorter than this (after normalization) are never treated as reposts,
+# so short replies and 'image omitted' lines are kept
+REPOST_MIN_LENGTH = 20
+
+def message_fingerprint(msg):
+    """Hash of the normalized sender and text of a raw (not yet enriched) message"""
+    text = ' '.join(clean_line(msg.message_backup).lower().split())
+    if len(text) < REPOST_MIN_LENGTH:
+        return None
+    sender = msg.sender_phone or ' '.join(msg.sender_name.lower().split())
+    return hashlib.blake2b(f"{sender}\n{text}".encode('utf-8'), digest_size=16).digest()
+
+class FingerprintSet:
+    """Exact set of message fingerprints"""
     
-    print(f"\nTotal messages: {len(all_messages)}")
+    def __init__(self):
+        self.seen = set()
     
-    if all_messages:
-        # Add unique ID and extract mobile numbers from messages
-        mobile_pattern = r'(01[0125]\d{8})'
-        
-        for i, msg in enumerate(all_messages, 1):
-            # Add unique ID
-            msg['unique_id'] = f"PRO{i}"
-            
-            # Extract mobile numbers from message content
-            found_numbers = re.findall(mobile_pattern, msg['message'])
-            if found_numbers:
-                # If sender_phone is empty, set to first found number only
-                if not msg['sender_phone']:
-                    msg['sender_phone'] = found_numbers[0]
-                
-                # Remove all found numbers from message
-                for num in found_numbers:
-                    msg['message'] = re.sub(re.escape(num), '', msg['message'])
-                
-                # Clean up extra spaces and punctuation
-                msg['message'] = re.sub(r'[.\s]+', ' ', msg['message']).strip()
-            
-            # Look for additional mobile numbers with various formats
-            additional_patterns = [
-                # 10-digit numbers like 0103147894 (common shortened format)
-                r'[،,\s]*([01]\d{9})[،,\s]*',
-                # Numbers at end with commas/special chars like ،،،0103147894
-                r'[،,\s]*([01][0125]\d{8})[،,\s]*',
-                # Numbers with Arabic-Indic digits (٠١٢٣٤٥٦٧٨٩)
-                r'([٠-٩]{10,11})',
-                # Numbers in embedded messages like +20 109 199 2423 (with Unicode chars)
-                r'[\u200a\u202a]*\+20\s*(\d{3})\s*(\d{3})\s*(\d{4})[\u202c]*',
-                # Flexible pattern with spaces/dots/dashes
-                r'(01[0125][\s\-\.\u00A0]*\d[\s\-\.\u00A0]*\d[\s\-\.\u00A0]*\d[\s\-\.\u00A0]*\d[\s\-\.\u00A0]*\d[\s\-\.\u00A0]*\d[\s\-\.\u00A0]*\d[\s\-\.\u00A0]*\d)',
-                # Numbers with spaces like 010 6306 6855
-                r'([01][0125]\d[\s]*\d{3}[\s]*\d{4})',
-            ]
-            
-            for pattern in additional_patterns:
-                matches = re.findall(pattern, msg['message'])
-                for match in matches:
-                    if isinstance(match, tuple):  # For patterns with groups
-                        if len(match) == 3:  # +20 xxx xxx xxxx format
-                            clean_number = '0' + ''.join(match)  # Convert +20 109 199 2423 to 01091992423
-                        else:
-                            clean_number = ''.join(match)
-                    else:
-                        clean_number = match
-                    
-                    # Convert Arabic-Indic digits to Western digits
-                    arabic_to_western = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
-                    clean_number = clean_number.translate(arabic_to_western)
-                    
-                    # Remove all non-digit characters
-                    clean_number = re.sub(r'[^\d]', '', clean_number)
-                    
-                    # Check if it's a valid Egyptian mobile number (10 or 11 digits)
-                    # Egyptian mobile prefixes: 010, 011, 012, 015, 0100, 0101, 0102, 0106, 0109
-                    if (len(clean_number) >= 10 and len(clean_number) <= 11 and
-                        (clean_number.startswith(('010', '011', '012', '015', '0100', '0101', '0102', '0106', '0109')) or 
-                         (len(clean_number) == 10 and clean_number.startswith(('01')))) and
-                        clean_number != msg['sender_phone'] and 
-                        not msg['sender_phone_2']):
-                        msg['sender_phone_2'] = clean_number
-                        
-                        # Remove the original match from message
-                        if isinstance(match, tuple):
-                            if len(match) == 3:
-                                # For +20 format, remove the whole pattern
-                                msg['message'] = re.sub(r'[\u200a\u202a]*\+20\s*' + re.escape(match[0]) + r'\s*' + re.escape(match[1]) + r'\s*' + re.escape(match[2]) + r'[\u202c]*', '', msg['message'])
-                            else:
-                                original_pattern = re.escape(''.join(match))
-                                msg['message'] = re.sub(original_pattern, '', msg['message'])
-                        else:
-                            # For single match, try to remove with surrounding chars
-                            original_pattern = re.escape(match)
-                            msg['message'] = re.sub(r'[،,\s]*' + original_pattern + r'[،,\s]*', ' ', msg['message'])
-                            msg['message'] = re.sub(original_pattern, '', msg['message'])
-                        
-                        break  # Only take the first valid number found
-            
-            # Clean up extra spaces and punctuation
-            msg['message'] = re.sub(r'[.\s]+', ' ', msg['message']).strip()
-            
-            # Remove emojis and media references from both message and message_backup
-            msg['message'] = remove_emojis(msg['message'])
-            msg['message'] = clean_media_references(msg['message'])
-            
-            # Extract status keywords from message_backup (original message)
-            msg['status'] = extract_status_keywords(msg['message_backup'])
-            
-            # Extract region names from message_backup (original message)
-            msg['region'] = extract_region_names(msg['message_backup'])
-            
-            # Extract property type from message_backup (original message)
-            msg['property_type'] = extract_property_type(msg['message_backup'])
-            
-            # Extract property type from message_backup (original message)
-            msg['property_type'] = extract_property_type(msg['message_backup'])
-            
-            # Also clean sender_name from emojis
-            msg['sender_name'] = remove_emojis(msg['sender_name'])
-            
-            # Final cleanup - remove extra spaces
-            msg['message'] = re.sub(r'\s+', ' ', msg['message']).strip()
-            msg['sender_name'] = re.sub(r'\s+', ' ', msg['sender_name']).strip()
-        
+    def add(self, fingerprint):
+        """Add a fingerprint and return True if it was already present"""
+        if fingerprint in self.seen:
+            return True
+        self.seen.add(fingerprint)
+        return False
+
+class BloomFilter:
+    """Fixed-size probabilistic fingerprint set for very large corpora
+    
+    Uses about 1.2 bytes per expected message at a 1% false positive rate;
+    a false positive means an original message is treated as a repost.
+    """
+    
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def add(self, fingerprint):
+        """Add a fingerprint and return True if it was (probably) already present"""
+        # Double hashing over the two halves of the 128-bit fingerprint
+        h1 = int.from_bytes(fingerprint[:8], 'little')
+        h2 = int.from_bytes(fingerprint[8:], 'little') | 1
+        present = True
+        for i in range(self.hash_count):
+            bit = (h1 + i * h2) % self.size
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self.bits[byte] & mask:
+                present = False
+                self.bits[byte] |= mask
+        return present
+
+def with_fingerprints(messages):
+    """Attach the repost fingerprint while messages are still raw (used by workers)"""
+    for msg in messages:
+        msg.fingerprint = message_fingerprint(msg)
+        yield msg
+
+def filter_reposts(messages, seen, mode, stats):
+    """Flag or drop messages whose sender and text were already seen in this run"""
+    for msg in messages:
+        fingerprint = msg.fingerprint if hasattr(msg, 'fingerprint') else message_fingerprint(msg)
+        is_repost = fingerprint is not None and seen.add(fingerprint)
+        if is_repost:
+            stats['reposts'] += 1
+            if mode == 'drop':
+                continue
+        if mode == 'flag':
+            msg.is_repost = 1 if is_repost else 0
+        yield msg
+
+def assign_content_ids(messages):
+    """Give messages stable IDs derived from their file, line and header (--incremental)"""
+    for msg in messages:
+        msg.unique_id = content_message_id(msg.file_source, msg.line_number, msg.date, msg.time, header_sender(msg))
+        yield msg
+
+def assign_unique_ids(messages, start=1):
+    """Number messages PRO1, PRO2, ... in the order they arrive"""
+    for i, msg in enumerate(messages, start):
+        msg.unique_id = f"PRO{i}"
+        yield msg
+
+def hash_file_prefix(filename, size):
+    """SHA-256 of the first `size` bytes of a file"""
+    sha = hashlib.sha256()
+    remaining = size
+    with open(filename, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            sha.update(chunk)
+            remaining -= len(chunk)
+    return sha.hexdigest()
+
+def message_digest(msg):
+    """Hash of a message's original text, used to spot a re-parsed tail message"""
+    return hashlib.sha1(msg.message_backup.encode('utf-8')).hexdigest()
+
+def load_manifest(path=MANIFEST_PATH):
+    """Load the incremental-parse manifest (empty if missing or from another version)"""
+    empty = {'version': MANIFEST_VERSION, 'output': None, 'output_size': None, 'files': {}}
+    if not os.path.exists(path):
+        return empty
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable manifest {path}: {e}")
+        return empty
+    if manifest.get('version') != MANIFEST_VERSION:
+        return empty
+    return manifest
+
+def write_json(data, path):
+    """Write a JSON state file atomically"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Write the manifest atomically"""
+    write_json(manifest, path)
+
+def plan_incremental_run(files, manifest, output_path, headers=CSV_HEADERS):
+    """Decide what to parse for an --incremental run
+    
+    Returns (plans, append). A file is skipped when it is unchanged, resumed
+    from its last message when it only grew, and parsed from the start when
+    it is new. If any known file was rewritten or removed, or the output no
+    longer matches the manifest, everything is parsed again (append=False).
+    """
+    known = manifest['files']
+    
+    def rebuild(reason):
+        print(f"🔄 Full re-parse: {reason}")
+        manifest['files'] = {}
+        return [(filename, 0, os.path.getsize(filename), 1) for filename in files], False
+    
+    if not known:
+        return rebuild("no previous manifest")
+    if manifest.get('output') != output_path or not os.path.exists(output_path):
+        return rebuild(f"{output_path} is missing or was written without --incremental")
+    if os.path.getsize(output_path) != manifest.get('output_size'):
+        return rebuild(f"{output_path} changed since the last incremental run")
+    if manifest.get('headers', CSV_HEADERS) != headers:
+        return rebuild("output columns changed")
+    removed = [filename for filename in known if filename not in files]
+    if removed:
+        return rebuild(f"{len(removed)} file(s) no longer present")
+    
+    plans = []
+    for filename in files:
+        entry = known.get(filename)
+        size = os.path.getsize(filename)
+        if entry is None:
+            plans.append((filename, 0, size, 1))
+            continue
+        if 'size' not in entry:
+            # A previous run failed part way through this file: carry on from its last message
+            plans.append((filename, entry['offset'], size, entry['line_number']))
+            continue
+        if size < entry['size'] or hash_file_prefix(filename, entry['size']) != entry['prefix_hash']:
+            return rebuild(f"{filename} was modified, not just appended to")
+        if size == entry['size']:
+            print(f"Unchanged: {filename}")
+            continue
+        # Resume at the last message we saw: it may have gained continuation lines
+        plans.append((filename, entry['offset'], size, entry['line_number']))
+    return plans, True
+
+def skip_known_messages(messages, manifest, stats):
+    """Drop re-parsed tail messages that were already written unchanged
+    
+    A tail message that gained continuation lines is written again with the
+    same unique_id and its ID is added to stats['rewritten_ids'], so the
+    earlier row can be dropped (see drop_superseded_rows).
+    """
+    known = manifest['files']
+    for msg in messages:
+        entry = known.get(msg.file_source)
+        if entry and msg.unique_id == entry.get('last_id'):
+            if message_digest(msg) == entry.get('last_digest'):
+                continue
+            stats['rewritten'] += 1
+            stats['rewritten_ids'].add(msg.unique_id)
+        yield msg
+
+def drop_superseded_rows(path, unique_ids, appended_from):
+    """Remove the earlier CSV rows of messages an --incremental run wrote again
+    
+    Rows before byte `appended_from` (where this run started appending) whose
+    unique_id is in `unique_ids` are dropped, so every unique_id is left with
+    one row, the newest. The rows kept are written back unchanged and the
+    appended part is copied as is; the file is replaced atomically.
+    """
+    temp_path = path + '.tmp'
+    dropped = 0
+    with open(path, 'rb') as src, open(temp_path, 'w', newline='', encoding='utf-8') as dst:
+        def old_lines():
+            while src.tell() < appended_from:
+                yield src.readline().decode('utf-8')
         
+        writer = csv.writer(dst)
+        reader = csv.reader(old_lines())
+        header = next(reader)
+        writer.writerow(header)
+        id_index = header.index('unique_id')
+        for row in reader:
+            if row[id_index] in unique_ids:
+                dropped += 1
+                continue
+            writer.writerow(row)
+        dst.flush()
+        shutil.copyfileobj(src, dst.buffer)
+    os.replace(temp_path, path)
+    return dropped
+
+def track_manifest(messages, manifest):
+    """Pass messages through while recording where each file's last message starts"""
+    known = manifest['files']
+    for msg in messages:
+        entry = known.setdefault(msg.file_source, {})
+        entry['offset'] = msg.byte_offset
+        entry['line_number'] = msg.line_number
+        entry['last_id'] = msg.unique_id
+        entry['last_digest'] = message_digest(msg)
+        yield msg
+
+def finish_manifest(manifest, plans, output_path, failed=()):
+    """Record sizes and prefix hashes of the parsed files plus the output size
+    
+    Failed files keep their previous size so the next run resumes them from
+    the last message that was written.
+    """
+    for filename, start, end, first_line in plans:
+        entry = manifest['files'].setdefault(filename, {'offset': 0, 'line_number': 1})
+        if filename in failed:
+            continue
+        size = end if end is not None else os.path.getsize(filename)
+        entry['size'] = size
+        entry['prefix_hash'] = hash_file_prefix(filename, size)
+    manifest['output'] = output_path
+    manifest['output_size'] = os.path.getsize(output_path) if os.path.exists(output_path) else None
+
+# Resume point of an interrupted run, written every --checkpoint-every messages
+CHECKPOINT_PATH = 'whatsapp_chats.checkpoint.json'
+CHECKPOINT_VERSION = 1
+
+class Checkpointer:
+    """Saves a resume point every `every` messages while the output is written
+    
+    The output writer asks due() before writing each message; when it says so,
+    the writer makes everything before that message durable and calls
+    save(msg, position). The checkpoint then records where the message starts
+    (file, byte offset, line), the ID it gets and the output position to roll
+    back to: the CSV size in bytes or the last SQLite row id.
+    """
+    
+    def __init__(self, state, plans, every, path=CHECKPOINT_PATH):
+        self.state = state
+        self.plans = plans
+        self.plan_index = {plan[0]: i for i, plan in enumerate(plans)}
+        self.every = every
+        self.path = path
+        self.count = 0
+        self.saved = 0
+    
+    def due(self):
+        """Count a message about to be written; True when a checkpoint comes first"""
+        written = self.count
+        self.count += 1
+        return written > 0 and written % self.every == 0
+    
+    def save(self, msg, position):
+        index = self.plan_index[msg.file_source]
+        filename, start, end, first_line = self.plans[index]
+        self.state['plans'] = [(filename, msg.byte_offset, end, msg.line_number)] + self.plans[index + 1:]
+        self.state['next_id'] = int(msg.unique_id[3:])
+        self.state['output_position'] = position
+        write_json(self.state, self.path)
+        self.saved += 1
+    
+    def finish(self):
+        """The run completed: nothing left to resume"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def new_checkpoint_state(plans, output_format, output_path, headers):
+    """Fixed part of a checkpoint: what was being written and the input it came from"""
+    return {
+        'version': CHECKPOINT_VERSION,
+        'output_format': output_format,
+        'output': output_path,
+        'headers': headers,
+        'sizes': {plan[0]: os.path.getsize(plan[0]) for plan in plans},
+    }
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    """Load the checkpoint of an interrupted run (None if missing, unreadable or from another version)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable checkpoint {path}: {e}")
+        return None
+    if checkpoint.get('version') != CHECKPOINT_VERSION or 'plans' not in checkpoint:
+        return None
+    checkpoint['plans'] = [tuple(plan) for plan in checkpoint['plans']]
+    return checkpoint
+
+def resume_problem(checkpoint, output_format, output_path, headers):
+    """Why a checkpoint cannot be resumed with these options (None if it can)"""
+    if checkpoint is None:
+        return f"no checkpoint found ({CHECKPOINT_PATH})"
+    if checkpoint['output_format'] != output_format or checkpoint['output'] != output_path:
+        return f"the checkpoint was written for {checkpoint['output']}"
+    if not os.path.exists(output_path):
+        return f"{output_path} is missing"
+    if checkpoint['headers'] != headers:
+        return "output columns changed"
+    for filename, size in checkpoint['sizes'].items():
+        if not os.path.exists(filename) or os.path.getsize(filename) != size:
+            return f"{filename} changed since the checkpoint"
+    return None
+
+def roll_back_output(output_format, output_path, position):
+    """Drop whatever was written after the checkpoint"""
+    if output_format == 'sqlite':
+        conn = sqlite3.connect(output_path)
+        try:
+            conn.execute("DELETE FROM properties WHERE id > ?", (position,))
+            conn.commit()
+        finally:
+            conn.close()
+    else:
+        with open(output_path, 'r+b') as f:
+            f.truncate(position)
+
+def new_run_stats(sample_size=5):
+    """Create the running counters shown at the end of a run"""
+    return {
+        'total': 0,
+        'phone': 0,
+        'phone_2': 0,
+        'status': 0,
+        'region': 0,
+        'region_id': 0,
+        'property_type': 0,
+        'rewritten': 0,
+        'rewritten_ids': set(),
+        'reposts': 0,
+        'cache_hits': 0,
+        'cache_misses': 0,
+        'senders': set(),
+        'samples': [],
+        'sample_size': sample_size,
+    }
+
+def track_stats(messages, stats):
+    """Pass messages through while updating the running counters"""
+    for msg in messages:
+        stats['total'] += 1
+        if msg.sender_phone:
+            stats['phone'] += 1
+        if msg.sender_phone_2:
+            stats['phone_2'] += 1
+        if msg.status:
+            stats['status'] += 1
+        if msg.region:
+            stats['region'] += 1
+        if msg.region_id:
+            stats['region_id'] += 1
+        if msg.property_type:
+            stats['property_type'] += 1
+        stats['senders'].add(msg.sender_name)
+        if len(stats['samples']) < stats['sample_size']:
+            stats['samples'].append(dict(msg))
+        yield msg
+
+def format_duration(seconds):
+    """h:mm:ss"""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
 
-        # Save to CSV
-        headers = ['unique_id', 'file_source', 'date', 'time', 'sender_name', 'sender_phone', 'sender_phone_2', 'message', 'message_backup', 'status', 'region', 'property_type', 'line_number']
-        with open('whatsapp_chats.csv', 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(all_messages)
-        print(f"✅ CSV saved: whatsapp_chats.csv")
+def report_progress(messages, plans, interval=5.0):
+    """Pass messages through, printing messages/s, MB/s and ETA every `interval` seconds
+    
+    Progress is measured in input bytes: a message's offset in its file plus
+    the planned bytes of the files before it.
+    """
+    total = 0
+    bases = {}
+    for filename, start, end, first_line in plans:
+        bases[filename] = total - start
+        total += (end if end is not None else os.path.getsize(filename)) - start
+    clock = time.perf_counter
+    started = clock()
+    next_report = started + interval
+    count = 0
+    for msg in messages:
+        count += 1
+        now = clock()
+        if now >= next_report:
+            elapsed = now - started
+            done = bases[msg.file_source] + msg.byte_offset
+            rate = done / elapsed
+            eta = format_duration((total - done) / rate) if rate > 0 else '?'
+            print(f"⏳ {count:,} messages | {count / elapsed:,.0f} msgs/s | {rate / (1024 * 1024):.2f} MB/s | "
+                  f"{done / total if total else 1:.0%} of input | ETA {eta}", flush=True)
+            next_report = now + interval
+        yield msg
+
+def write_csv(messages, path, append=False, headers=CSV_HEADERS, checkpoint=None):
+    """Write messages to CSV as they arrive; the file is only created once there is a row
+    
+    With a Checkpointer, the file is flushed to disk and a resume point saved
+    whenever one is due.
+    """
+    count = 0
+    csvfile = None
+    try:
+        for msg in messages:
+            if checkpoint is not None and checkpoint.due():
+                csvfile.flush()
+                os.fsync(csvfile.fileno())
+                checkpoint.save(msg, os.path.getsize(path))
+            if csvfile is None:
+                csvfile = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+                writer = csv.DictWriter(csvfile, fieldnames=headers, extrasaction='ignore')
+                if not append:
+                    writer.writeheader()
+            writer.writerow(msg)
+            count += 1
+    finally:
+        if csvfile is not None:
+            csvfile.close()
+    return count
+
+# Same clean-up csv_to_sqlite.clean_data applies before inserting
+SQLITE_TEXT_COLUMNS = {'sender_name', 'message', 'message_backup', 'region', 'property_type'}
+SQLITE_PHONE_COLUMNS = {'sender_phone', 'sender_phone_2'}
+SQLITE_INTEGER_COLUMNS = {'line_number', 'is_repost'}
+
+def sqlite_row(msg, columns):
+    """Convert a message to a row tuple for the properties table"""
+    row = []
+    for column in columns:
+        value = msg.get(column, '')
+        if column in SQLITE_INTEGER_COLUMNS:
+            try:
+                value = int(value or 0)
+            except (TypeError, ValueError):
+                value = 0
+        else:
+            value = str(value)
+            if column in SQLITE_TEXT_COLUMNS:
+                value = value.strip()
+            elif column in SQLITE_PHONE_COLUMNS:
+                value = re.sub(r'[^\d+]', '', value)
+        row.append(value)
+    return tuple(row)
+
+def write_sqlite(messages, db_path, columns, append=False, batch_size=5000, commit_every=100000, checkpoint=None):
+    """Insert messages straight into the properties table of a SQLite database
+    
+    Rows are inserted with executemany in batches of `batch_size`, committing
+    every `commit_every` rows. A fresh run recreates the schema; an append
+    run upserts on unique_id so re-written tail messages replace their row.
+    With a Checkpointer, pending rows are committed and a resume point saved
+    whenever one is due.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    count = 0
+    try:
+        if not append:
+            create_database_schema(cursor)
+            conn.commit()
         
-        # Show statistics
-        phone_count = sum(1 for msg in all_messages if msg['sender_phone'])
-        phone2_count = sum(1 for msg in all_messages if msg['sender_phone_2'])
-        status_count = sum(1 for msg in all_messages if msg['status'])
-        region_count = sum(1 for msg in all_messages if msg['region'])
-        property_type_count = sum(1 for msg in all_messages if msg['property_type'])
-        print(f"📊 Statistics:")
-        print(f"  - Total messages: {len(all_messages)}")
-        print(f"  - Messages with phone numbers: {phone_count}")
-        print(f"  - Messages with second phone numbers: {phone2_count}")
-        print(f"  - Messages with status keywords: {status_count}")
-        print(f"  - Messages with region information: {region_count}")
-        print(f"  - Messages with property type information: {property_type_count}")
-        print(f"  - Unique senders: {len(set(msg['sender_name'] for msg in all_messages))}")
+        column_list = ', '.join(columns)
+        placeholders = ', '.join('?' * len(columns))
+        insert_sql = f"INSERT INTO properties ({column_list}) VALUES ({placeholders})"
+        if append:
+            updates = ', '.join(f"{column} = excluded.{column}" for column in columns if column != 'unique_id')
+            insert_sql += f" ON CONFLICT(unique_id) DO UPDATE SET {updates}"
         
-        # Show sample
-        print("\n📋 Sample messages:")
-        for i, msg in enumerate(all_messages[:5]):
-            phone_display = f" ({msg['sender_phone']})" if msg['sender_phone'] else ""
-            phone2_display = f" + {msg['sender_phone_2']}" if msg['sender_phone_2'] else ""
-            region_display = f" [📍{msg['region']}]" if msg['region'] else ""
-            property_type_display = f" [🏡{msg['property_type']}]" if msg['property_type'] else ""
-            print(f"{i+1}. {msg['unique_id']} - [{msg['date']} {msg['time']}] {msg['sender_name']}{phone_display}{phone2_display}{region_display}{property_type_display}: {msg['message'][:50]}...")
+        batch = []
+        for msg in messages:
+            if checkpoint is not None and checkpoint.due():
+                if batch:
+                    cursor.executemany(insert_sql, batch)
+                    count += len(batch)
+                    batch = []
+                conn.commit()
+                checkpoint.save(msg, cursor.execute("SELECT MAX(id) FROM properties").fetchone()[0] or 0)
+            batch.append(sqlite_row(msg, columns))
+            if len(batch) >= batch_size:
+                cursor.executemany(insert_sql, batch)
+                count += len(batch)
+                batch = []
+                if count % commit_every < batch_size:
+                    conn.commit()
+        if batch:
+            cursor.executemany(insert_sql, batch)
+            count += len(batch)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    return count
+
+def backup_database(db_path):
+    """Rename an existing database to a timestamped backup (as csv_to_sqlite.py does)"""
+    if os.path.exists(db_path):
+        base, ext = os.path.splitext(db_path)
+        backup_name = f"{base}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}"
+        os.rename(db_path, backup_name)
+        print(f"💾 Existing database backed up as: {backup_name}")
+
+# Running counters of derived columns, reported only when the column is written
+COLUMN_STATS = [
+    ('sender_phone', 'phone', "Messages with phone numbers"),
+    ('sender_phone_2', 'phone_2', "Messages with second phone numbers"),
+    ('status', 'status', "Messages with status keywords"),
+    ('region', 'region', "Messages with region information"),
+    ('region_id', 'region_id', "Messages with a canonical region ID"),
+    ('property_type', 'property_type', "Messages with property type information"),
+]
+
+def print_run_stats(stats, columns=CSV_HEADERS):
+    """Print statistics and sample messages from the running counters"""
+    print(f"📊 Statistics:")
+    print(f"  - Total messages: {stats['total']}")
+    for column, counter, label in COLUMN_STATS:
+        if column in columns:
+            print(f"  - {label}: {stats[counter]}")
+    print(f"  - Unique senders: {len(stats['senders'])}")
+    if stats['reposts']:
+        print(f"  - Reposts detected: {stats['reposts']}")
+    lookups = stats['cache_hits'] + stats['cache_misses']
+    if lookups:
+        print(f"  - Enrichment cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses "
+              f"({stats['cache_hits'] / lookups:.1%} hit rate)")
+    
+    # Show sample
+    print("\n📋 Sample messages:")
+    for i, msg in enumerate(stats['samples']):
+        phone_display = f" ({msg['sender_phone']})" if msg['sender_phone'] else ""
+        phone2_display = f" + {msg['sender_phone_2']}" if msg['sender_phone_2'] else ""
+        region_display = f" [📍{msg['region']}]" if msg['region'] else ""
+        property_type_display = f" [🏡{msg['property_type']}]" if msg['property_type'] else ""
+        print(f"{i+1}. {msg['unique_id']} - [{msg['date']} {msg['time']}] {msg['sender_name']}{phone_display}{phone2_display}{region_display}{property_type_display}: {msg['message'][:50]}...")
+
+# Functions timed by --profile (looked up by name at call time, so they can be wrapped in place)
+PROFILED_STAGES = [
+    'clean_line', 'parse_message', 'message_fingerprint', 'extract_phone_numbers', 'remove_emojis',
+    'clean_media_references', 'scan_keywords', 'extract_status_keywords', 'extract_region_names',
+    'primary_region_id', 'extract_property_type',
+]
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="WhatsApp Chat Parser - Simple Version")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of processes used to parse and enrich files in parallel (default: 1)")
+    parser.add_argument('--split-mb', type=int, metavar='N', default=8,
+                        help="with --workers, split exports larger than N MB into message-aligned ranges "
+                             "parsed in parallel (default: 8, 0 keeps one process per file)")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"only parse what was appended since the last incremental run (tracked in {MANIFEST_PATH}); "
+                             "IDs are derived from each message's file and line so existing rows keep them")
+    parser.add_argument('--skip-duplicate-files', action='store_true',
+                        help="skip exports that are byte-identical to an earlier export (each skipped file is listed)")
+    parser.add_argument('--reposts', choices=['keep', 'flag', 'drop'], default='keep',
+                        help="what to do with messages whose sender and text were already seen: keep them (default), "
+                             "add an is_repost column, or drop them before enrichment")
+    parser.add_argument('--bloom', type=int, metavar='N', default=0,
+                        help="track repost fingerprints in a Bloom filter sized for N messages instead of an exact set")
+    parser.add_argument('--output', choices=['csv', 'sqlite', 'parquet'], default='csv',
+                        help="write whatsapp_chats.csv (default), insert straight into the SQLite properties table, "
+                             "or write columnar whatsapp_chats.parquet (a whatsapp_chats.columns directory without pyarrow)")
+    parser.add_argument('--db', default='real_estate_data.db',
+                        help="database used by --output sqlite (default: real_estate_data.db)")
+    parser.add_argument('--checkpoint-every', type=int, metavar='N', default=50000,
+                        help=f"flush the output and save a resume point to {CHECKPOINT_PATH} every N messages "
+                             "(default: 50000, 0 disables)")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue an interrupted run from its last checkpoint")
+    parser.add_argument('--progress', type=float, metavar='SECONDS', default=5.0,
+                        help="print messages/s, MB/s and ETA every SECONDS (default: 5, 0 disables)")
+    parser.add_argument('--fields', metavar='COLUMNS',
+                        help="comma-separated output columns (unique_id is always written); only the "
+                             "extractors those columns need are run, e.g. --fields date,sender_phone,sender_phone_2")
+    parser.add_argument('--cache-size', type=int, metavar='N', default=10000,
+                        help="remember the enrichment of the last N distinct message texts (default: 10000, 0 disables)")
+    parser.add_argument('--profile', action='store_true',
+                        help="time every parsing stage per file and print a breakdown (runs with a single process)")
+    parser.add_argument('--profile-json', metavar='PATH',
+                        help="also write the per-file stage timings to PATH as JSON (implies --profile)")
+    args = parser.parse_args()
+    if args.profile_json:
+        args.profile = True
+    if args.incremental and args.output == 'parquet':
+        parser.error("--incremental needs --output csv or sqlite (columnar output is always rewritten)")
+    if args.resume and (args.incremental or args.output == 'parquet' or args.reposts != 'keep'):
+        parser.error("--resume works for full csv or sqlite runs without --reposts (--incremental runs resume on their own)")
+    if args.fields is not None:
+        args.fields = [field.strip() for field in args.fields.split(',') if field.strip()]
+        unknown = [field for field in args.fields if field not in CSV_HEADERS]
+        if unknown:
+            parser.error(f"unknown field(s): {', '.join(unknown)} (choose from {', '.join(CSV_HEADERS)})")
+    return args
+
+def main():
+    args = parse_args()
+    
+    print("🔍 WhatsApp Chat Parser - Simple Version")
+    print("=" * 50)
+    
+    # Find chat files (sorted so IDs are reproducible across runs and worker counts)
+    files = sorted(glob.glob("whatsapp_chat_exports/_chat*.txt"))
+    print(f"Found {len(files)} chat files")
+    if args.skip_duplicate_files:
+        files = skip_duplicate_exports(files)
+    profiler = None
+    if args.profile:
+        if args.workers > 1:
+            print("⏱️  --profile times stages in this process, ignoring --workers")
+            args.workers = 1
+        profiler = StageProfiler()
+        profiler.install(globals(), PROFILED_STAGES, reader='read_chat_lines', file_entry='iter_chat_messages')
+    if args.workers > 1:
+        print(f"Using {args.workers} worker processes")
+    
+    if args.output == 'sqlite':
+        output_path = args.db
+    elif args.output == 'parquet':
+        from columnar_store import columnar_path
+        output_path = columnar_path('whatsapp_chats')
+    else:
+        output_path = 'whatsapp_chats.csv'
+    headers = CSV_HEADERS
+    if args.fields is not None:
+        headers = [column for column in CSV_HEADERS if column == 'unique_id' or column in args.fields]
+    if args.reposts == 'flag':
+        headers = headers + ['is_repost']
+    plan = ExtractorPlan(args.fields)
+    if args.fields is not None:
+        print(f"Extractors: {', '.join(plan.extractors()) or 'none'}")
+    plans = [full_parse_plan(filename) for filename in files]
+    append = False
+    manifest = None
+    next_id = 1
+    if args.incremental:
+        manifest = load_manifest()
+        plans, append = plan_incremental_run(files, manifest, output_path, headers)
+    elif args.resume:
+        checkpoint = load_checkpoint()
+        problem = resume_problem(checkpoint, args.output, output_path, headers)
+        if problem:
+            print(f"❌ Cannot resume: {problem}")
+            return
+        plans = checkpoint['plans']
+        next_id = checkpoint['next_id']
+        roll_back_output(args.output, output_path, checkpoint['output_position'])
+        append = True
+        print(f"⏩ Resuming at PRO{next_id}: {plans[0][0]} from byte {plans[0][1]:,}")
+    elif os.path.exists(CHECKPOINT_PATH):
+        print(f"⚠️  Starting over; {CHECKPOINT_PATH} from an interrupted run is replaced (use --resume to continue it)")
+    checkpointer = None
+    if manifest is None and args.output != 'parquet' and args.reposts == 'keep' and args.checkpoint_every > 0:
+        state = new_checkpoint_state(plans, args.output, output_path, headers)
+        checkpointer = Checkpointer(state, plans, args.checkpoint_every)
+    
+    # Streaming pipeline: read lines -> assemble messages -> enrich -> number -> count -> write
+    stats = new_run_stats()
+    failed = set()
+    raw_filter = None
+    if args.reposts != 'keep':
+        seen = BloomFilter(args.bloom) if args.bloom else FingerprintSet()
+        raw_filter = lambda messages: filter_reposts(messages, seen, args.reposts, stats)
+    cache = EnrichmentCache(args.cache_size, plan) if args.cache_size > 0 and plan.text_steps else None
+    messages = stream_messages(plans, args.workers, failed, raw_filter, cache, args.split_mb * 1024 * 1024, plan)
+    if args.progress > 0:
+        messages = report_progress(messages, plans, args.progress)
+    if manifest is None:
+        messages = assign_unique_ids(messages, next_id)
+    else:
+        messages = assign_content_ids(messages)
+        messages = skip_known_messages(messages, manifest, stats)
+        messages = track_manifest(messages, manifest)
+    messages = track_stats(messages, stats)
+    if args.output == 'sqlite':
+        if not append:
+            backup_database(output_path)
+        columns = [column for column in headers if column in PROPERTIES_COLUMNS]
+        written = write_sqlite(messages, output_path, columns, append=append, checkpoint=checkpointer)
+    elif args.output == 'parquet':
+        from columnar_store import write_columnar
+        written = write_columnar(messages, output_path, headers, integer_columns=SQLITE_INTEGER_COLUMNS)
+    else:
+        appended_from = os.path.getsize(output_path) if append else 0
+        written = write_csv(messages, output_path, append=append, headers=headers, checkpoint=checkpointer)
+        if stats['rewritten_ids']:
+            drop_superseded_rows(output_path, stats['rewritten_ids'], appended_from)
+    if checkpointer is not None:
+        checkpointer.finish()
+    if cache is not None:
+        stats['cache_hits'] = cache.hits
+        stats['cache_misses'] = cache.misses
+    
+    if manifest is not None:
+        manifest['headers'] = headers
+        finish_manifest(manifest, plans, output_path, failed)
+        save_manifest(manifest)
+    
+    print(f"\nTotal {'new ' if append else ''}messages: {written}")
+    
+    if written:
+        output_label = {'sqlite': 'SQLite database', 'parquet': 'Columnar file'}.get(args.output, 'CSV')
+        print(f"✅ {output_label} {'updated' if append else 'saved'}: {output_path}")
+        if stats['rewritten']:
+            print(f"⚠️  {stats['rewritten']} message(s) gained lines since the last run and were written again with the same unique_id"
+                  + (", replacing their earlier rows" if args.output == 'csv' else ""))
+        print_run_stats(stats, headers)
+    elif append:
+        print("✅ Nothing new to parse")
     else:
         print("❌ No messages found")
+    
+    if profiler is not None:
+        profiler.print_report()
+        if args.profile_json:
+            profiler.save_json(args.profile_json)
+            print(f"⏱️  Stage timings saved: {args.profile_json}")
 
 if __name__ == "__main__":
     main()
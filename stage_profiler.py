@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Per-stage profiler for simple_parser.py (--profile).
+Wraps the parser's stage functions in place and records, per chat file,
+the time spent in each stage, how often it ran and how much input it saw.
+
+Stage times are exclusive: when a timed stage calls another one (clean_line
+inside message_fingerprint, remove_emojis inside normalize_message), the
+inner call's time is charged to the inner stage only, so the stages and
+"other" add up to the wall time.
+"""
+
+import json
+import time
+
+class StageProfiler:
+    """Collects {file: {stage: [seconds, calls, bytes]}} while a parse runs"""
+
+    def __init__(self):
+        self.files = {}
+        self.file_wall = {}
+        self.current_file = None
+        self.file_started = None
+        # Time spent in timed stages called by each running timed stage, innermost last
+        self.child_seconds = []
+
+    def start_file(self, filename):
+        """Attribute the following calls to `filename` (closes the previous file's wall clock)"""
+        self.finish_file()
+        self.current_file = filename
+        self.file_started = time.perf_counter()
+        self.files.setdefault(filename, {})
+
+    def finish_file(self):
+        """Stop the wall clock of the current file"""
+        if self.current_file is not None:
+            elapsed = time.perf_counter() - self.file_started
+            self.file_wall[self.current_file] = self.file_wall.get(self.current_file, 0.0) + elapsed
+            self.current_file = None
+
+    def record(self, stage, seconds, size):
+        stages = self.files.setdefault(self.current_file, {})
+        entry = stages.get(stage)
+        if entry is None:
+            entry = stages[stage] = [0.0, 0, 0]
+        entry[0] += seconds
+        entry[1] += 1
+        entry[2] += size
+
+    def timed_call(self, func, *args, **kwargs):
+        """Call func; returns (result, seconds not spent in nested timed stages)"""
+        child_seconds = self.child_seconds
+        child_seconds.append(0.0)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = child_seconds.pop()
+            if child_seconds:
+                child_seconds[-1] += elapsed
+        return result, elapsed - nested
+
+    def wrap(self, stage, func):
+        """Time every call of func; its first argument (text or bytes) counts as input size"""
+        timed_call = self.timed_call
+        record = self.record
+
+        def timed(*args, **kwargs):
+            result, own = timed_call(func, *args, **kwargs)
+            data = args[0] if args else ''
+            record(stage, own, len(data.encode('utf-8')) if isinstance(data, str) else len(data))
+            return result
+        timed.__wrapped__ = func
+        return timed
+
+    def wrap_file_entry(self, func):
+        """Start a new file whenever func(filename, ...) is called
+
+        func is the per-file entry point, so work it does before its result is
+        consumed (such as header format detection) is charged to that file.
+        """
+        def entry(filename, *args, **kwargs):
+            self.start_file(filename)
+            return func(filename, *args, **kwargs)
+        entry.__wrapped__ = func
+        return entry
+
+    def wrap_reader(self, stage, func):
+        """Time a line reader generator item by item
+
+        The reader yields (line_number, raw_line, offset) tuples; raw_line sizes count as input.
+        """
+        timed_call = self.timed_call
+        record = self.record
+
+        def timed(filename, *args, **kwargs):
+            lines = func(filename, *args, **kwargs)
+            while True:
+                item, own = timed_call(next, lines, None)
+                if item is None:
+                    return
+                record(stage, own, len(item[1]))
+                yield item
+        timed.__wrapped__ = func
+        return timed
+
+    def install(self, namespace, stages, reader=None, file_entry=None):
+        """Replace each stage function in a module namespace by its timed version
+
+        `file_entry` names the function called once per file, which starts
+        that file's timings.
+        """
+        for stage in stages:
+            namespace[stage] = self.wrap(stage, namespace[stage])
+        if reader:
+            namespace[reader] = self.wrap_reader(reader, namespace[reader])
+        if file_entry:
+            namespace[file_entry] = self.wrap_file_entry(namespace[file_entry])
+
+    def totals(self):
+        """{stage: [seconds, calls, bytes]} summed over all files"""
+        totals = {}
+        for stages in self.files.values():
+            for stage, (seconds, calls, size) in stages.items():
+                entry = totals.setdefault(stage, [0.0, 0, 0])
+                entry[0] += seconds
+                entry[1] += calls
+                entry[2] += size
+        return totals
+
+    def print_report(self):
+        """Print the stage breakdown over all files, slowest stage first"""
+        self.finish_file()
+        totals = self.totals()
+        wall = sum(self.file_wall.values())
+        print(f"\n⏱️  Stage profile ({len(self.file_wall)} file(s), {wall:.2f}s wall):")
+        print(f"  {'stage':<26} {'time':>8} {'share':>7} {'calls':>10} {'calls/s':>12} {'MB/s':>8}")
+        for stage, (seconds, calls, size) in sorted(totals.items(), key=lambda item: -item[1][0]):
+            share = seconds / wall if wall else 0.0
+            rate = calls / seconds if seconds else 0.0
+            mb_rate = size / seconds / (1024 * 1024) if seconds else 0.0
+            print(f"  {stage:<26} {seconds:>7.2f}s {share:>7.1%} {calls:>10,} {rate:>12,.0f} {mb_rate:>8.1f}")
+        other = wall - sum(seconds for seconds, _, _ in totals.values())
+        print(f"  {'(other: assembly, cache, output)':<26} {other:>7.2f}s {other / wall if wall else 0.0:>7.1%}")
+
+    def to_dict(self):
+        """Per-file and total stage timings as plain JSON-ready data"""
+        self.finish_file()
+
+        def stage_dict(stages):
+            return {stage: {'seconds': round(seconds, 6), 'calls': calls, 'bytes': size}
+                    for stage, (seconds, calls, size) in sorted(stages.items())}
+
+        return {
+            'wall_seconds': round(sum(self.file_wall.values()), 6),
+            'totals': stage_dict(self.totals()),
+            'files': {
+                filename: {'wall_seconds': round(self.file_wall.get(filename, 0.0), 6), 'stages': stage_dict(stages)}
+                for filename, stages in self.files.items()
+            },
+        }
+
+    def save_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
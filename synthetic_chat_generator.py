@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Synthetic WhatsApp Export Generator
+Writes realistic real-estate group exports for benchmarking simple_parser.py
+without sharing production chats.
+
+The output mimics WhatsApp's iOS export: `[dd/mm/yyyy, h:mm:ss AM]` headers
+with narrow no-break spaces, `~ name` and `+20 ...` senders wrapped in
+direction marks, multi-line Arabic/English ads, `image omitted` lines, emojis
+and phone numbers embedded in several formats. The same seed and size always
+produce the same files. --format writes Android (`dd/mm/yyyy, h:mm AM - `) or
+24-hour headers instead, or a different format per file with `mixed`; Android
+exports also get sender-less system lines (`... - Ahmed added +20 ...`).
+
+Usage:
+    python synthetic_chat_generator.py --lines 1000000 --seed 7 --output-dir synthetic_exports
+    python synthetic_chat_generator.py --files 4 --format mixed
+"""
+
+import os
+import sys
+import random
+import argparse
+from datetime import datetime, timedelta
+
+# Characters WhatsApp puts around headers and phone numbers
+NARROW_NBSP = '\u202f'
+NBSP = '\u00a0'
+LRM = '\u200e'
+LRE = '\u202a'
+PDF = '\u202c'
+
+SENDER_NAMES = [
+    'احمد عقارات', 'م/مها الهوارى للعقارات', 'محمد السيد', 'شركة النخبة للتسويق العقاري', 'ابو يوسف',
+    'Karma Trust', 'Williams Fred', 'Sara Real Estate', 'Omar Properties', 'الاستاذة عبير',
+    'مكتب الامل', 'Eng. Tarek', 'نور للاستثمار العقاري', 'Hassan Homes', 'عمرو للمقاولات',
+]
+
+STATUS_PHRASES = ['للبيع', 'مطلوب', 'للايجار', 'معروض', 'للاستثمار', 'for sale', 'for rent', 'wanted', 'available']
+PROPERTY_PHRASES = ['شقة', 'شقه', 'فيلا', 'دوبلكس', 'قطعة ارض', 'محل', 'مكتب', 'عمارة', 'apartment', 'villa', 'duplex', 'land', 'shop']
+REGION_PHRASES = [
+    'العاشر من رمضان', 'الحي 21', 'مجاورة 3', 'التجمع الخامس', 'مدينة بدر', 'الشروق', 'العبور',
+    'المرحلة (10)', 'شرق الجامعة', 'غرب جولف', 'new cairo', '6th october', 'الرحاب', 'امتداد الحي',
+]
+DETAIL_LINES = [
+    'مساحة {area} متر', 'الدور {floor}', '{rooms} غرف و {baths} حمام', 'مطبخ وريسبشن', 'تشطيب سوبر لوكس',
+    'السعر {price} الف', 'كاش او تقسيط', 'مقدم {down}% والباقي على {years} سنوات', 'عداد كهرباء ومياه',
+    'Area {area} m2', 'Price {price}K EGP', '{rooms} bedrooms, {baths} bathrooms', 'Fully finished',
+    'قريبة من الخدمات والمواصلات', 'للتواصل', 'للجادين فقط', 'استلام فوري', 'رخصة بناء سارية',
+]
+EMOJIS = ['🏠', '🏡', '🔥', '✅', '📞', '💰', '📍', '🔵', '🟣', '⭐', '👌', '🙏']
+SYSTEM_MESSAGES = [
+    'image omitted', 'video omitted', 'This message was deleted', 'sticker omitted',
+    'joined using this group\'s invite link', 'Messages and calls are end-to-end encrypted.',
+]
+# Android system lines: a header with no sender, e.g. "12/01/2024, 10:01 - Ahmed added +20 111 222 3333"
+ANDROID_SYSTEM_EVENTS = [
+    '{name} added {phone}', '{name} left', '{phone} joined using this group\'s invite link',
+    '{name} changed the group description', '{name} removed {phone}',
+]
+HEADER_STYLES = ['ios', 'ios_24h', 'android', 'android_24h']
+ARABIC_INDIC = str.maketrans('0123456789', '٠١٢٣٤٥٦٧٨٩')
+
+def random_mobile(rng):
+    """An 11-digit Egyptian mobile number"""
+    return rng.choice(['010', '011', '012', '015']) + ''.join(rng.choice('0123456789') for _ in range(8))
+
+def format_phone(rng, number):
+    """Render a mobile number the way people type it in ads"""
+    style = rng.randrange(6)
+    if style == 0:
+        return number
+    if style == 1:
+        return f"{number[:3]} {number[3:7]} {number[7:]}"
+    if style == 2:
+        return f"{number[:4]}-{number[4:7]}-{number[7:]}"
+    if style == 3:
+        return number.translate(ARABIC_INDIC)
+    if style == 4:
+        return f"+20 {number[1:4]} {number[4:7]} {number[7:]}"
+    return f"{LRE}+20{NBSP}{number[1:4]}{NBSP}{number[4:7]}{NBSP}{number[7:]}{PDF}"
+
+def format_header(timestamp, sender, style='ios'):
+    """Message header in one of HEADER_STYLES, e.g. iOS `[dd/mm/yyyy, h:mm:ss AM] sender: `"""
+    hour = timestamp.hour % 12 or 12
+    suffix = 'AM' if timestamp.hour < 12 else 'PM'
+    if style == 'ios_24h':
+        return f"[{timestamp:%d/%m/%Y, %H:%M:%S}] {sender}: "
+    if style == 'android':
+        return f"{timestamp:%d/%m/%Y}, {hour}:{timestamp:%M}{NARROW_NBSP}{suffix} - {sender}: "
+    if style == 'android_24h':
+        return f"{timestamp:%d/%m/%Y, %H:%M} - {sender}: "
+    return f"[{timestamp:%d/%m/%Y}, {hour}:{timestamp:%M:%S}{NARROW_NBSP}{suffix}] {sender}: "
+
+def format_system_line(timestamp, text, style='android'):
+    """Android system line: the message header without a sender"""
+    if style == 'android_24h':
+        return f"{timestamp:%d/%m/%Y, %H:%M} - {text}"
+    hour = timestamp.hour % 12 or 12
+    suffix = 'AM' if timestamp.hour < 12 else 'PM'
+    return f"{timestamp:%d/%m/%Y}, {hour}:{timestamp:%M}{NARROW_NBSP}{suffix} - {text}"
+
+def random_system_event(rng):
+    """Text of one Android system line"""
+    number = random_mobile(rng)
+    return rng.choice(ANDROID_SYSTEM_EVENTS).format(
+        name=rng.choice(SENDER_NAMES), phone=f"+20 {number[1:4]} {number[4:7]} {number[7:]}")
+
+def random_sender(rng, style='ios'):
+    """`~ name` (plain name on Android) for members with a profile name, a +20 number for everyone else"""
+    if rng.random() < 0.75:
+        name = rng.choice(SENDER_NAMES)
+        return name if style.startswith('android') else f"~{NARROW_NBSP}{name}"
+    number = random_mobile(rng)
+    return f"{LRE}+20{NBSP}{number[1:4]}{NBSP}{number[4:7]}{NBSP}{number[7:]}{PDF}"
+
+def fill(rng, template):
+    return template.format(area=rng.randrange(80, 1200, 10), floor=rng.randrange(1, 12),
+                           rooms=rng.randrange(1, 6), baths=rng.randrange(1, 4),
+                           price=rng.randrange(300, 9000, 50), down=rng.randrange(10, 50, 5),
+                           years=rng.randrange(2, 10))
+
+def random_ad(rng):
+    """Lines of one multi-line property ad"""
+    first = f"{rng.choice(STATUS_PHRASES)} {rng.choice(PROPERTY_PHRASES)} في {rng.choice(REGION_PHRASES)}"
+    if rng.random() < 0.3:
+        first = rng.choice(EMOJIS) * rng.randrange(1, 4) + ' ' + first
+    lines = [first]
+    for _ in range(rng.randrange(0, 8)):
+        lines.append(fill(rng, rng.choice(DETAIL_LINES)))
+        if rng.random() < 0.15:
+            lines.append('')
+    lines.append(f"{rng.choice(['للتواصل', 'ت', 'Call', 'واتساب'])} {format_phone(rng, random_mobile(rng))}")
+    if rng.random() < 0.3:
+        lines.append(''.join(rng.choice(EMOJIS) for _ in range(rng.randrange(2, 8))))
+    return lines
+
+def generate_messages(rng, start, style='ios'):
+    """Endless stream of (header, [line, ...]) messages in time order
+    
+    Android system lines come out as (whole line, [''])."""
+    timestamp = start
+    recent_ads = []
+    while True:
+        timestamp += timedelta(seconds=rng.randrange(5, 900))
+        sender = random_sender(rng, style)
+        roll = rng.random()
+        if style.startswith('android') and roll < 0.03:
+            yield format_system_line(timestamp, random_system_event(rng), style), ['']
+            continue
+        if roll < 0.12:
+            lines = [LRM + rng.choice(SYSTEM_MESSAGES)]
+        elif roll < 0.25 and recent_ads:
+            # Reposted ad: the same text again, often by the same sender
+            sender, lines = rng.choice(recent_ads)
+        else:
+            lines = random_ad(rng)
+            recent_ads.append((sender, lines))
+            if len(recent_ads) > 200:
+                recent_ads.pop(0)
+        yield format_header(timestamp, sender, style), lines
+
+def write_export(path, rng, line_budget, start, style='ios'):
+    """Write one export file of about `line_budget` lines; returns the lines written"""
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for header, lines in generate_messages(rng, start, style):
+            if written >= line_budget:
+                break
+            # Messages end with \r\n; line breaks inside a message are bare \n
+            f.write(header + '\n'.join(lines) + '\r\n')
+            written += len(lines)
+    return written
+
+def generate_exports(output_dir, total_lines, seed=0, files=1, style='ios'):
+    """Write `files` exports with about `total_lines` lines in total; returns their paths
+    
+    `style` is one of HEADER_STYLES, or 'mixed' to cycle through them file by file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    per_file = max(1, total_lines // files)
+    for i in range(1, files + 1):
+        path = os.path.join(output_dir, f"_chat {i}.txt")
+        start = datetime(2024, 1, 1) + timedelta(days=rng.randrange(0, 365))
+        file_style = HEADER_STYLES[(i - 1) % len(HEADER_STYLES)] if style == 'mixed' else style
+        write_export(path, rng, per_file, start, file_style)
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic WhatsApp export generator")
+    parser.add_argument('--lines', type=int, default=100000,
+                        help="approximate number of lines to generate in total (default: 100000)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument('--files', type=int, default=1, help="number of export files (default: 1)")
+    parser.add_argument('--format', choices=HEADER_STYLES + ['mixed'], default='ios',
+                        help="header format: iOS (default), Android, their 24-hour variants, or one per file")
+    parser.add_argument('--output-dir', default='synthetic_exports',
+                        help="directory for the generated _chat N.txt files (default: synthetic_exports)")
+    args = parser.parse_args()
+
+    print("🧪 Synthetic WhatsApp Export Generator")
+    print("=" * 50)
+    paths = generate_exports(args.output_dir, args.lines, args.seed, args.files, args.format)
+    size = sum(os.path.getsize(path) for path in paths)
+    print(f"✅ Wrote {len(paths)} file(s) to {args.output_dir}/ ({size / (1024 * 1024):.1f} MB, seed {args.seed})")
+
+if __name__ == "__main__":
+    sys.exit(main())
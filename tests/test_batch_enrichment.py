@@ -0,0 +1,43 @@
+import math
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from batch_enrichment import enrich_batch, enrich_scalar
+from simple_parser import MAX_REGIONS
+
+MESSAGES = [
+    # Arabic status, type and neighborhood
+    'للبيع شقة 120 متر في الحي العاشر مجاورة 3 للتواصل',
+    'مطلوب للايجار فيلا في الشروق',
+    # English, with overlapping keywords (for sale / sale, for rent / rent / rental)
+    'Villa for sale in New Cairo, rental also possible, looking for offers',
+    'FOR RENT apartment with 3 rooms and 2 bathroom in Maadi',
+    # Context keywords only count in their original case
+    'Nice place, 3 ROOMS and KITCHEN',
+    'Nice place, 3 rooms and kitchen',
+    # More regions than MAX_REGIONS
+    'للبيع ارض في العبور او الشروق او بدر او الرحاب او مدينة نصر او المعادي',
+    # Nothing to find, empty and missing
+    'صباح الخير',
+    '',
+    None,
+    float('nan'),
+]
+
+
+def test_batch_matches_scalar():
+    texts = pd.Series(MESSAGES, dtype=object)
+    batch = enrich_batch(texts)
+    assert_frame_equal(batch, enrich_scalar(texts), check_dtype=False)
+
+    # The rows exercise what they are meant to
+    assert batch['region'][6].count(', ') == MAX_REGIONS - 1
+    assert batch['property_type'][4] != batch['property_type'][5]
+    assert (batch.iloc[-3:] == '').all().all()
+
+
+def test_list_input_gets_a_default_index():
+    texts = ['للبيع شقة', math.nan, 'for rent']
+    assert_frame_equal(enrich_batch(texts), enrich_scalar(texts), check_dtype=False)
+    assert list(enrich_batch(texts).index) == [0, 1, 2]
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from columnar_store import is_columnar, read_columns, write_columnar
+
+COLUMNS = ['unique_id', 'message', 'line_number']
+
+
+def rows(count, fail_at=None):
+    for i in range(1, count + 1):
+        if i == fail_at:
+            raise RuntimeError('parser died')
+        yield {'unique_id': f'PRO{i}', 'message': f'للبيع شقة {i}', 'line_number': i}
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'chats.columns')
+    assert write_columnar(rows(25), path, COLUMNS, integer_columns={'line_number'}, batch_size=10) == 25
+    assert is_columnar(path)
+    data = read_columns(path, ['unique_id', 'line_number'])
+    assert data['unique_id'][-1] == 'PRO25'
+    assert data['line_number'] == list(range(1, 26))
+
+
+def test_failed_write_leaves_no_output(tmp_path):
+    path = str(tmp_path / 'chats.columns')
+    with pytest.raises(RuntimeError):
+        write_columnar(rows(25, fail_at=15), path, COLUMNS, batch_size=10)
+    assert not os.path.exists(path)
+    assert not is_columnar(path)
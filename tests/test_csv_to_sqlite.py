@@ -0,0 +1,59 @@
+import csv
+import sqlite3
+
+import pytest
+
+from database_schema import PROPERTIES_COLUMNS
+
+
+@pytest.fixture
+def importer(tmp_path, monkeypatch):
+    # csv_to_sqlite logs to csv_to_sqlite.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    import csv_to_sqlite
+    return csv_to_sqlite
+
+
+def write_rows(path, count, duplicate_of=None):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=PROPERTIES_COLUMNS)
+        writer.writeheader()
+        for i in range(1, count + 1):
+            unique_id = f"PRO{duplicate_of if i == count and duplicate_of else i}"
+            writer.writerow({
+                'unique_id': unique_id, 'file_source': '_chat 1.txt', 'date': '24/05/2025',
+                'time': '6:22:15 PM', 'ts': '2025-05-24T18:22:15', 'sender_name': 'Ahmed',
+                'sender_phone': '01012345678', 'sender_phone_2': '', 'message': f'للبيع شقة {i}',
+                'message_backup': f'للبيع شقة {i}', 'status': 'للبيع', 'region': '', 'region_id': '',
+                'property_type': 'شقة', 'line_number': i, 'is_repost': 0,
+            })
+
+
+@pytest.fixture
+def small_variable_limit(monkeypatch):
+    connect = sqlite3.connect
+
+    def limited_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 100)
+        return conn
+
+    monkeypatch.setattr(sqlite3, 'connect', limited_connect)
+
+
+def count_rows(db_file, table):
+    with sqlite3.connect(db_file) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_chunks_respect_the_variable_limit(importer, tmp_path, small_variable_limit):
+    write_rows(tmp_path / 'chats.csv', 2500)
+    assert importer.import_csv_to_sqlite(str(tmp_path / 'chats.csv'), str(tmp_path / 'db.sqlite'))
+    assert count_rows(tmp_path / 'db.sqlite', 'properties') == 2500
+
+
+def test_bad_row_is_rejected_under_the_variable_limit(importer, tmp_path, small_variable_limit):
+    write_rows(tmp_path / 'chats.csv', 2500, duplicate_of=7)
+    assert importer.import_csv_to_sqlite(str(tmp_path / 'chats.csv'), str(tmp_path / 'db.sqlite'))
+    assert count_rows(tmp_path / 'db.sqlite', 'properties') == 2499
+    assert count_rows(tmp_path / 'db.sqlite', 'properties_rejects') == 1
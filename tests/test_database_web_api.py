@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip('flask')
+
+import database_web_api
+
+# properties table as csv_to_sqlite.py created it before the ts and region_id columns
+OLD_PROPERTIES_TABLE_SQL = """
+CREATE TABLE properties (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    unique_id TEXT UNIQUE,
+    file_source TEXT,
+    date TEXT,
+    time TEXT,
+    sender_name TEXT,
+    sender_phone TEXT,
+    sender_phone_2 TEXT,
+    message TEXT,
+    message_backup TEXT,
+    status TEXT,
+    region TEXT,
+    property_type TEXT,
+    line_number INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+@pytest.fixture
+def old_database(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'real_estate_data.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(OLD_PROPERTIES_TABLE_SQL)
+        conn.executemany(
+            "INSERT INTO properties (unique_id, date, time, message, message_backup) VALUES (?, ?, ?, ?, ?)", [
+                ('PRO1', '24/05/2025', '6:22:15 PM', 'للبيع شقة في العبور', 'للبيع شقة في العبور'),
+                ('PRO2', '02/06/2025', '9:05:00 AM', 'مطلوب ارض في الشروق', 'مطلوب ارض في الشروق'),
+                ('PRO3', '15/06/2025', '11:40:00 PM', 'صباح الخير', 'صباح الخير'),
+            ])
+    monkeypatch.setattr(database_web_api, 'DB_PATH', db_path)
+    return db_path
+
+
+def test_migration_backfills_ts_and_region_id(old_database):
+    assert database_web_api.migrate_database(old_database, batch_size=2) == 3
+    with sqlite3.connect(old_database) as conn:
+        rows = conn.execute("SELECT unique_id, ts, region_id FROM properties ORDER BY id").fetchall()
+    assert rows == [
+        ('PRO1', '2025-05-24T18:22:15', 'obour'),
+        ('PRO2', '2025-06-02T09:05:00', 'shorouk'),
+        ('PRO3', '2025-06-15T23:40:00', ''),
+    ]
+    # Already migrated rows are left alone
+    assert database_web_api.migrate_database(old_database) == 0
+
+
+def test_list_endpoint_works_on_a_migrated_database(old_database):
+    database_web_api.migrate_database(old_database)
+    client = database_web_api.app.test_client()
+    response = client.get('/api/properties?date_from=2025-06-01&region_id=shorouk')
+    assert response.status_code == 200
+    assert [row['unique_id'] for row in response.get_json()['data']] == ['PRO2']
@@ -0,0 +1,25 @@
+from phone_extractor import extract_phone_numbers
+
+
+def test_floor_number_before_mobile_is_kept():
+    numbers, text = extract_phone_numbers('الدور 2 01012345678 شقة')
+    assert numbers == ['01012345678']
+    assert text == 'الدور 2 شقة'
+
+
+def test_shortened_number_after_full_number():
+    numbers, text = extract_phone_numbers('01092421058 0106280988')
+    assert numbers == ['01092421058', '0106280988']
+    assert text.strip() == ''
+
+
+def test_year_before_mobile_is_not_a_country_code():
+    numbers, text = extract_phone_numbers('بناء ٢٠١٤ 01020501358')
+    assert numbers == ['01020501358']
+    assert text == 'بناء ٢٠١٤ '
+
+
+def test_country_code_forms():
+    assert extract_phone_numbers('‪+20 109 199 2423‬')[0] == ['01091992423']
+    assert extract_phone_numbers('201091992423')[0] == ['01091992423']
+    assert extract_phone_numbers('0020 109 199 2423')[0] == ['01091992423']
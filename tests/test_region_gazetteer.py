@@ -0,0 +1,16 @@
+from region_gazetteer import primary_region_id, resolve_regions
+
+
+def test_floor_ordinal_is_not_tenth_of_ramadan():
+    text = 'للبيع شقة في الدور العاشر بعمارة جديدة في العبور'
+    assert primary_region_id(text) == 'obour'
+    assert 'tenth_of_ramadan' not in dict(resolve_regions(text))
+
+
+def test_tenth_of_ramadan_aliases():
+    for text in ('ارض في العاشر من رمضان', 'شقة في مدينة العاشر', 'فيلا في العاشر رمضان', 'villa in 10th of ramadan'):
+        assert primary_region_id(text) == 'tenth_of_ramadan', text
+
+
+def test_tenth_district_is_a_neighborhood():
+    assert primary_region_id('شقة في الحي العاشر') == 'district_10'
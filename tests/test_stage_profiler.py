@@ -0,0 +1,36 @@
+import stage_profiler
+from stage_profiler import StageProfiler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_nested_stages_record_exclusive_time(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(stage_profiler.time, 'perf_counter', clock)
+    profiler = StageProfiler()
+    namespace = {}
+
+    def clean_line(text):
+        clock.now += 2.0
+        return text
+
+    def message_fingerprint(text):
+        clock.now += 1.0
+        return namespace['clean_line'](text) + namespace['clean_line'](text)
+
+    namespace.update(clean_line=clean_line, message_fingerprint=message_fingerprint)
+    profiler.install(namespace, ['clean_line', 'message_fingerprint'])
+    profiler.start_file('_chat 1.txt')
+    namespace['message_fingerprint']('abc')
+    profiler.finish_file()
+
+    totals = profiler.totals()
+    assert totals['message_fingerprint'] == [1.0, 1, 3]
+    assert totals['clean_line'] == [4.0, 2, 6]
+    assert sum(seconds for seconds, _, _ in totals.values()) == profiler.file_wall['_chat 1.txt']
@@ -18,6 +18,8 @@ import glob
 from collections import Counter
 from pathlib import Path
 
+from columnar_store import is_columnar, read_columns
+
 
 class WordFrequencyAnalyzer:
     """
@@ -79,6 +81,27 @@ class WordFrequencyAnalyzer:
             print(f"❌ Error reading file {file_path}: {str(e)}")
             return []
     
+    def process_columnar_file(self, file_path, column='message'):
+        """
+        Extract words from one column of a columnar parser output.
+        
+        Only the requested column is read, so e.g. `message_backup` is skipped.
+        
+        Args:
+            file_path (str): Path to a .parquet file or .columns directory
+            column (str): Column holding the text to analyze
+            
+        Returns:
+            list: List of words from the column
+        """
+        try:
+            texts = read_columns(file_path, [column])[column]
+            print(f"✅ Successfully read column '{column}' from: {file_path}")
+            return self.clean_and_tokenize('\n'.join(texts))
+        except Exception as e:
+            print(f"❌ Error reading column '{column}' from {file_path}: {str(e)}")
+            return []
+    
     def process_multiple_files(self, file_paths):
         """
         Process multiple text files and combine word extraction.
@@ -92,7 +115,11 @@ class WordFrequencyAnalyzer:
         all_words = []
         
         for file_path in file_paths:
-            if os.path.isfile(file_path):
+            if is_columnar(file_path):
+                words = self.process_columnar_file(file_path)
+                all_words.extend(words)
+                print(f"📊 Extracted {len(words):,} words from {os.path.basename(file_path)}")
+            elif os.path.isfile(file_path):
                 words = self.process_single_file(file_path)
                 all_words.extend(words)
                 print(f"📊 Extracted {len(words):,} words from {os.path.basename(file_path)}")
@@ -206,6 +233,7 @@ def main():
         print("  python word_frequency_analyzer.py input.txt output.txt")
         print("  python word_frequency_analyzer.py 'whatsapp_chat_exports/*.txt'")
         print("  python word_frequency_analyzer.py file1.txt file2.txt file3.txt")
+        print("  python word_frequency_analyzer.py whatsapp_chats.parquet   # reads only the message column")
         print("\n🔧 Programmatic Usage:")
         print("  analyzer = WordFrequencyAnalyzer()")
         print("  analyzer.analyze_files('input.txt', 'output.txt')")